@@ -1,15 +1,61 @@
-"""Helper utilities for authenticated API requests from the Streamlit app."""
+"""Helper utilities for authenticated API requests from the Streamlit app.
+
+All backend traffic goes through a single process-wide ``requests.Session`` so
+that TCP/TLS connections to ``backend_url()`` are pooled and kept alive across
+calls, reruns and users instead of being re-established for every request.
+"""
 
 from __future__ import annotations
 
 import os
+import threading
+from typing import Any
 
+import requests
 import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from response_cache import ResponseCache, make_key
 
 load_dotenv()
 
 
+def _setting(name: str, default: str) -> str:
+    """Return a setting from Streamlit secrets with environment fallback."""
+    if hasattr(st, "secrets"):
+        try:
+            if name in st.secrets:
+                return str(st.secrets.get(name))
+        except Exception:  # no secrets.toml available
+            pass
+    return os.getenv(name, default)
+
+
+# Connection pool sizing: one pool per backend host, ``POOL_MAXSIZE`` sockets
+# kept alive in it. Requests beyond that open a temporary extra connection
+# rather than waiting, so long uploads never starve short reads.
+POOL_CONNECTIONS = int(_setting("API_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(_setting("API_POOL_MAXSIZE", "32"))
+# (connect, read) timeouts in seconds applied when callers do not pass one.
+CONNECT_TIMEOUT = float(_setting("API_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(_setting("API_READ_TIMEOUT", "60"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+# Idempotent requests are retried on connection errors and gateway failures.
+MAX_RETRIES = int(_setting("API_MAX_RETRIES", "2"))
+
+# Read-endpoint response cache, shared by all users of this process.
+CACHE_MAX_BYTES = int(_setting("API_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL = float(_setting("API_CACHE_TTL", "600"))
+# Transcripts do not change once produced, so they may live longer.
+TRANSCRIPT_CACHE_TTL = float(_setting("API_TRANSCRIPT_CACHE_TTL", "3600"))
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+RESPONSE_CACHE = ResponseCache(max_bytes=CACHE_MAX_BYTES, default_ttl=CACHE_TTL)
+
+
 def auth_headers() -> dict[str, str]:
     """Return authorization headers using the stored Firebase ID token."""
     token = st.session_state.get("id_token")
@@ -18,6 +64,14 @@ def auth_headers() -> dict[str, str]:
     return {"Authorization": f"Bearer {token}"}
 
 
+def current_user_id() -> str:
+    """Return the logged-in user id, or ``""`` outside a script run."""
+    try:
+        return st.session_state.get("user_id") or ""
+    except Exception:  # no script run context (e.g. worker thread)
+        return ""
+
+
 def backend_url() -> str:
     """Return base URL for the backend service."""
     # Prefer Streamlit secrets; fallback to environment variable
@@ -26,3 +80,163 @@ def backend_url() -> str:
         if hasattr(st, "secrets") and "DEPLOYED_URL" in st.secrets
         else os.getenv("DEPLOYED_URL", "http://localhost:8000")
     )
+
+
+def _build_session() -> requests.Session:
+    """Create a ``requests.Session`` with a tuned, keep-alive connection pool."""
+    session = requests.Session()
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "DELETE"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+        pool_block=False,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide HTTP session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+def close_session() -> None:
+    """Close the shared session and drop its pooled connections."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+
+
+def request(
+    method: str,
+    path: str,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: Any = DEFAULT_TIMEOUT,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send ``method`` to ``path`` on the backend through the pooled session.
+
+    Parameters
+    ----------
+    method:
+        HTTP verb, e.g. ``"GET"``.
+    path:
+        Endpoint path relative to ``backend_url()``, e.g. ``"/get_user"``.
+    headers:
+        Extra headers. Authorization headers from the current Streamlit
+        session are added unless already present; pass them explicitly when
+        calling from a thread without a script run context.
+    timeout:
+        ``requests`` timeout; defaults to ``DEFAULT_TIMEOUT``.
+    """
+    merged = dict(headers or {})
+    if "Authorization" not in merged:
+        try:
+            merged.update(auth_headers())
+        except Exception:  # no script run context (e.g. worker thread)
+            pass
+    url = f"{backend_url()}/{path.lstrip('/')}"
+    return get_session().request(method, url, headers=merged, timeout=timeout, **kwargs)
+
+
+def get(path: str, **kwargs: Any) -> requests.Response:
+    """Send a GET request to the backend."""
+    return request("GET", path, **kwargs)
+
+
+def post(path: str, **kwargs: Any) -> requests.Response:
+    """Send a POST request to the backend."""
+    return request("POST", path, **kwargs)
+
+
+def delete(path: str, **kwargs: Any) -> requests.Response:
+    """Send a DELETE request to the backend."""
+    return request("DELETE", path, **kwargs)
+
+
+def conditional_get(
+    path: str,
+    *,
+    params: dict[str, Any] | None = None,
+    user_id: str | None = None,
+    ttl: float | None = None,
+    headers: dict[str, str] | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a GET request revalidating any cached copy with ``ETag``/``Last-Modified``.
+
+    If a response for the same user, path and params was stored earlier (even
+    one whose TTL has passed), its validators are sent as ``If-None-Match`` /
+    ``If-Modified-Since``. A ``304 Not Modified`` answer is served from the
+    stored response, so an unchanged resource costs only the headers.
+    """
+    namespace = user_id if user_id is not None else current_user_id()
+    key = make_key(namespace, path, params)
+    previous = RESPONSE_CACHE.get_stale(key)
+    merged = dict(headers or {})
+    if previous is not None:
+        etag = previous.headers.get("ETag")
+        last_modified = previous.headers.get("Last-Modified")
+        if etag:
+            merged["If-None-Match"] = etag
+        if last_modified:
+            merged["If-Modified-Since"] = last_modified
+    response = get(path, params=params, headers=merged, **kwargs)
+    if response.status_code == 304 and previous is not None:
+        RESPONSE_CACHE.refresh(key, ttl=ttl)
+        return previous
+    if response.status_code == 200:
+        RESPONSE_CACHE.put(key, response, size=len(response.content), ttl=ttl)
+    return response
+
+
+def cached_get(
+    path: str,
+    *,
+    params: dict[str, Any] | None = None,
+    user_id: str | None = None,
+    ttl: float | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a GET request, serving fresh responses from ``RESPONSE_CACHE``.
+
+    Entries are namespaced by ``user_id`` (defaults to the logged-in user) so
+    one user's responses are never served to another, and are sized by the
+    response body. Expired entries are revalidated with
+    :func:`conditional_get` rather than downloaded again.
+    """
+    namespace = user_id if user_id is not None else current_user_id()
+    cached = RESPONSE_CACHE.get(make_key(namespace, path, params))
+    if cached is not None:
+        return cached
+    return conditional_get(path, params=params, user_id=namespace, ttl=ttl, **kwargs)
+
+
+def invalidate_cached(user_id: str | None = None, path: str | None = None, **params: Any) -> int:
+    """Drop cached responses for ``user_id`` matching ``path`` and ``params``."""
+    namespace = user_id if user_id is not None else current_user_id()
+    return RESPONSE_CACHE.invalidate(namespace, path, **params)
+
+
+def cache_stats() -> dict[str, int]:
+    """Return hit, miss and eviction counters of the response cache."""
+    return RESPONSE_CACHE.stats()
@@ -0,0 +1,156 @@
+"""Pre-upload conversion of PCM WAV recordings to 16 kHz mono."""
+
+from __future__ import annotations
+
+import contextlib
+import glob
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+TARGET_RATE = 16_000
+# Frames read from the source file per block; memory use does not grow with file length
+BLOCK_FRAMES = 64 * 1024
+# Length of the anti-aliasing FIR filter applied before decimation
+FILTER_TAPS = 63
+# Converted copies left in the temp directory longer than this (seconds) are removed
+COPY_MAX_AGE = float(os.getenv("DOWNSAMPLE_COPY_MAX_AGE", str(24 * 60 * 60)))
+COPY_PREFIX = "theracompass-"
+
+
+def _lowpass_taps(cutoff: float, taps: int = FILTER_TAPS) -> np.ndarray:
+    """Return a Hann-windowed sinc low-pass filter; ``cutoff`` is a fraction of Nyquist."""
+    n = np.arange(taps) - (taps - 1) / 2
+    h = cutoff * np.sinc(cutoff * n) * np.hanning(taps)
+    return (h / h.sum()).astype(np.float64)
+
+
+def _pcm_to_float(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode interleaved little-endian PCM bytes to a float mono signal in [-1, 1]."""
+    if sample_width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128.0
+        scale = 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float64)
+        scale = 32768.0
+    elif sample_width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(ints & 0x800000, ints - (1 << 24), ints).astype(np.float64)
+        scale = float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float64)
+        scale = float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    return samples.reshape(-1, channels).mean(axis=1) / scale
+
+
+def downsample_wav(
+    src_path: str,
+    dst_path: str,
+    target_rate: int = TARGET_RATE,
+    block_frames: int = BLOCK_FRAMES,
+) -> tuple[int, int]:
+    """Write ``src_path`` as 16-bit mono PCM at ``target_rate`` to ``dst_path``.
+
+    The source is processed in blocks of ``block_frames``: channels are
+    averaged, a windowed-sinc low-pass removes content above the new Nyquist
+    frequency and the filtered signal is linearly resampled, all with NumPy
+    array operations. Filter state and the resampling position are carried
+    between blocks so the output has no seams.
+
+    Returns ``(source_bytes, converted_bytes)``. Raises ``wave.Error`` for
+    files that are not PCM WAV.
+    """
+    with wave.open(src_path, "rb") as src, wave.open(dst_path, "wb") as dst:
+        channels = src.getnchannels()
+        width = src.getsampwidth()
+        rate = src.getframerate()
+        dst.setnchannels(1)
+        dst.setsampwidth(2)
+        dst.setframerate(min(target_rate, rate))
+
+        step = rate / target_rate if rate > target_rate else 1.0
+        taps = _lowpass_taps(1.0 / step) if step > 1.0 else np.ones(1)
+        delay = (len(taps) - 1) / 2
+        history = np.zeros(len(taps) - 1)
+        # Last filtered sample of the previous block, at filtered index ``consumed - 1``
+        last_value = 0.0
+        consumed = 0  # filtered samples produced so far
+        next_out = 0  # index of the next output sample
+
+        total_frames = src.getnframes()
+        # Index of the last output sample that still falls inside the recording
+        final_out = int(np.floor((total_frames - 1) / step)) if total_frames else -1
+
+        def emit(filtered: np.ndarray) -> None:
+            nonlocal last_value, consumed, next_out
+            if not len(filtered):
+                return
+            index = np.arange(consumed - 1, consumed + len(filtered), dtype=np.float64)
+            values = np.concatenate(([last_value], filtered))
+            consumed += len(filtered)
+            last_value = filtered[-1]
+            # Output k sits at filtered index k * step + delay (filter group delay)
+            last_k = min(int(np.floor((consumed - 1 - delay) / step)), final_out)
+            if last_k < next_out:
+                return
+            positions = np.arange(next_out, last_k + 1) * step + delay
+            out = np.interp(positions, index, values)
+            next_out = last_k + 1
+            pcm = np.clip(np.round(out * 32767.0), -32768, 32767).astype("<i2")
+            dst.writeframes(pcm.tobytes())
+
+        while raw := src.readframes(block_frames):
+            block = _pcm_to_float(raw, width, channels)
+            padded = np.concatenate((history, block))
+            emit(np.convolve(padded, taps, mode="valid"))
+            history = padded[len(padded) - len(history):] if len(history) else history
+        # Flush the filter so the tail of the recording is not cut by the delay
+        if len(history):
+            padded = np.concatenate((history, np.zeros(len(history))))
+            emit(np.convolve(padded, taps, mode="valid"))
+    return os.path.getsize(src_path), os.path.getsize(dst_path)
+
+
+def purge_stale_copies(max_age: float = COPY_MAX_AGE) -> int:
+    """Remove converted copies not modified for ``max_age`` seconds; return how many."""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), f"{COPY_PREFIX}*.wav")):
+        with contextlib.suppress(OSError):
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+    return removed
+
+
+def downsampled_copy(
+    src_path: str, cache_key: str, target_rate: int = TARGET_RATE
+) -> tuple[str, int, int]:
+    """Return a converted copy of ``src_path`` in the temp directory, reusing an earlier one.
+
+    ``cache_key`` (e.g. the recording's content hash) names the copy, so a
+    retried or resumed upload sends the very same file without converting it
+    again. Returns ``(path, source_bytes, converted_bytes)``; the caller
+    removes the copy once it is no longer needed. Copies abandoned for longer
+    than ``COPY_MAX_AGE`` are purged here.
+    """
+    purge_stale_copies()
+    dst_path = os.path.join(
+        tempfile.gettempdir(), f"{COPY_PREFIX}{cache_key}-{target_rate}.wav"
+    )
+    if not os.path.exists(dst_path):
+        fd, tmp_path = tempfile.mkstemp(suffix=".wav", prefix=COPY_PREFIX)
+        os.close(fd)
+        try:
+            downsample_wav(src_path, tmp_path, target_rate)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        os.replace(tmp_path, dst_path)
+    return dst_path, os.path.getsize(src_path), os.path.getsize(dst_path)
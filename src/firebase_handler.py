@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from pathlib import Path
 from time import time
 from typing import Any
@@ -395,8 +396,12 @@ def save_json(collection: str, item_id: str, data: dict[str, Any]) -> None:
     else:
         path = Path("data") / collection
         path.mkdir(parents=True, exist_ok=True)
-        with open(path / f"{item_id}.json", "w", encoding="utf-8") as f:
+        # Write to a temporary file and swap it in, so concurrent readers
+        # (e.g. session loader threads) never see a half-written document
+        tmp_path = path / f".{item_id}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path / f"{item_id}.json")
         
 
 def load_json(collection: str, item_id: str) -> dict[str, Any] | None:
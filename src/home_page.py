@@ -4,33 +4,27 @@ import json
 
 import requests
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
 
 from framework_summary import TherapyFramework
 
-from api_client import auth_headers, backend_url
+import api_client
+import search_index
 from login import call_get_user_api
 from markdown_loader import load_markdown
-from styles import (
-    CARD_STYLE,
-    INPUT_STYLE,
-    WHITE_BUTTON_STYLE,
-    YELLOW_BUTTON_STYLE,
-)
+from theme import inject_theme, themed
 
 
 def call_new_patient(user_id: str, patient_name: str, framework: TherapyFramework) -> dict:
     """Call the FastAPI create_patient endpoint to create a new patient."""
     try:
         # Send POST request to the create_patient endpoint with user_id and patient_name
-        response = requests.post(
-            f"{backend_url()}/create_patient",
+        response = api_client.post(
+            "/create_patient",
             data={
                 "user_id": user_id,
                 "patient_name": patient_name,
                 "framework": framework.value,
             },
-            headers=auth_headers(),
         )
         response.raise_for_status()
         return response.json()
@@ -39,17 +33,77 @@ def call_new_patient(user_id: str, patient_name: str, framework: TherapyFramewor
         return {"error": str(e)}
 
 
+def format_timestamp(seconds: float) -> str:
+    """Return ``seconds`` as ``mm:ss`` (or ``h:mm:ss``)."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def display_session_search(
+    user_id: str,
+    patients: dict,
+    patient_id: str | None = None,
+    key: str = "session_search",
+) -> None:
+    """Render a search box over the user's sessions (optionally one patient's).
+
+    Results come from the local search index (see :mod:`search_index`), so no
+    transcript is downloaded to answer a query. Opening a hit jumps the
+    session page's transcript to the first occurrence.
+    """
+    owners = {
+        session_id: pid
+        for pid, patient in patients.items()
+        if patient_id in (None, pid)
+        for session_id in patient.get("items", {})
+    }
+    query = st.text_input(
+        "Cerca nelle sedute",
+        key=key,
+        placeholder="Parole o argomenti…",
+    )
+    if not query.strip():
+        return
+    search_index.load_sessions(user_id, owners)
+    hits = [
+        hit
+        for hit in search_index.search(user_id, query, patient_id=patient_id)
+        if hit.session_id in owners
+    ]
+    if not hits:
+        st.write("Nessun risultato.")
+        return
+    for hit in hits:
+        owner = owners[hit.session_id]
+        patient = patients.get(owner, {})
+        session = patient.get("items", {}).get(hit.session_id, {})
+        label = f"{patient.get('name', owner)} – {session.get('datetime', hit.session_id)}"
+        stamps = list(dict.fromkeys(format_timestamp(t) for t in hit.times))
+        where = ", ".join(stamps[:5]) if stamps else "nei riassunti"
+        text_col, open_col = st.columns([5, 1])
+        text_col.markdown(f"**{label}**  \n{where}")
+        if open_col.button("Apri", key=f"{key}_{hit.session_id}"):
+            st.session_state["selected_patient_id"] = owner
+            st.session_state["selected_session_id"] = hit.session_id
+            st.session_state["page"] = "session_page"
+            if hit.times:
+                st.session_state["transcript_jump_time"] = hit.times[0]
+            st.rerun()
+
+
 def home_page():  # noqa: C901, PLR0915
     """Render the home page."""
     st.markdown(load_markdown("login_style.md"), unsafe_allow_html=True)
+    inject_theme()
     # Top navigation buttons
     back_col, _, refresh_col = st.columns([1, 8, 1])
-    with back_col, stylable_container(key="back_scope", css_styles=WHITE_BUTTON_STYLE):
+    with back_col, themed("white-button", "back_scope"):
         if st.button("Esci"):
             st.session_state.pop("user_id", None)
             st.session_state.pop("response", None)
             st.rerun()
-    with refresh_col, stylable_container(key="refresh_scope", css_styles=WHITE_BUTTON_STYLE):
+    with refresh_col, themed("white-button", "refresh_scope"):
         if st.button("Aggiorna"):
             user_id = st.session_state.get("user_id")
             if user_id:
@@ -75,8 +129,13 @@ def home_page():  # noqa: C901, PLR0915
             refreshed if isinstance(refreshed, dict) else json.loads(refreshed)
         )
 
+    resp = st.session_state.get("response")
+    if isinstance(resp, dict):
+        with themed("card", "home_search_card"):
+            display_session_search(user_id, resp.get("patient_dir", {}) or {})
+
     # Display patients
-    with stylable_container(key="patient_list", css_styles=CARD_STYLE):
+    with themed("card", "patient_list"):
         # Section title for patients
         st.subheader("I tuoi pazienti")
 
@@ -98,15 +157,12 @@ def home_page():  # noqa: C901, PLR0915
         patients = resp.get("patient_dir", {}) or {}
         for patient in patients.values():
             with (
-                stylable_container(key=patient["name"], css_styles=CARD_STYLE),
+                themed("card", patient["name"]),
                 st.expander(patient["name"], expanded=True),
             ):
                 st.write(f"ID paziente: {patient['patient_id']}")
                 st.write(f"Numero di elementi del paziente: {len(patient['items'])}")
-                with stylable_container(
-                    key=patient["name"] + "_button",
-                    css_styles=WHITE_BUTTON_STYLE,
-                ):
+                with themed("white-button", patient["name"] + "_button"):
                     if st.button("Apri", key=patient["patient_id"]):
                         st.session_state["page"] = "patient_page"
                         st.session_state["selected_patient_id"] = patient["patient_id"]
@@ -114,13 +170,13 @@ def home_page():  # noqa: C901, PLR0915
 
     @st.dialog("-")
     def new_patient_dialog():
-        with stylable_container(key="modale", css_styles=CARD_STYLE):
+        with themed("card", "modale"):
             # Small space
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="modale_patient_name", css_styles=INPUT_STYLE):
+            with themed("input", "modale_patient_name"):
                 name = st.text_input("Patient Name", key="patient_name_modal")
             # Framework selection
-            with stylable_container(key="modale_framework", css_styles=INPUT_STYLE):
+            with themed("input", "modale_framework"):
                 framework = st.selectbox(
                     "Therapy Framework",
                     list(TherapyFramework),
@@ -129,10 +185,7 @@ def home_page():  # noqa: C901, PLR0915
                 )
             # Small space
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(
-                key="modale_new_patient_button",
-                css_styles=YELLOW_BUTTON_STYLE,
-            ):
+            with themed("yellow-button", "modale_new_patient_button"):
                 create_clicked = st.button("Create", key="create_patient_modal")
 
             if create_clicked:
@@ -152,6 +205,6 @@ def home_page():  # noqa: C901, PLR0915
                     st.error("Please enter a patient name.")
 
     # New Patient button (opens modal)
-    with stylable_container(key="new_patient_btn", css_styles=YELLOW_BUTTON_STYLE):
+    with themed("yellow-button", "new_patient_btn"):
         if st.button("New Patient", key="open_new_patient"):
             new_patient_dialog()
@@ -0,0 +1,110 @@
+"""Background polling of asynchronous ``process_audio`` jobs."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+
+import api_client
+
+# Polling schedule: start fast, back off exponentially up to a ceiling.
+JOB_POLL_INITIAL = float(os.getenv("JOB_POLL_INITIAL", "2"))
+JOB_POLL_MAX = float(os.getenv("JOB_POLL_MAX", "30"))
+# Give up polling a job after this many seconds.
+JOB_POLL_TIMEOUT = float(os.getenv("JOB_POLL_TIMEOUT", str(3 * 60 * 60)))
+
+TERMINAL_STATUSES = {"completed", "failed"}
+# Client errors worth polling again; any other 4xx fails the job at once
+RETRY_STATUSES = {408, 429}
+
+
+@dataclass
+class Job:
+    """State of one submitted analysis, updated by its polling thread."""
+
+    job_id: str
+    patient_id: str
+    label: str
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    # Content hash of the uploaded recording, indexed once the job completes
+    recording_sha256: str | None = None
+    # Set by the page once the finished job has been reflected in the UI
+    applied: bool = False
+
+    @property
+    def done(self) -> bool:
+        """Return whether the job reached a terminal status."""
+        return self.status in TERMINAL_STATUSES
+
+
+def _poll(job: Job, headers: dict[str, str]) -> None:
+    """Poll ``/job_status`` for ``job`` with exponential backoff until it finishes."""
+    delay = JOB_POLL_INITIAL
+    deadline = time.monotonic() + JOB_POLL_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        try:
+            response = api_client.get(
+                "/job_status", params={"job_id": job.job_id}, headers=headers
+            )
+            if 400 <= response.status_code < 500 and response.status_code not in RETRY_STATUSES:
+                # Unknown job or expired auth: polling again cannot succeed
+                job.status = "failed"
+                job.error = f"Stato dell'analisi non disponibile (HTTP {response.status_code})."
+                job.updated_at = time.time()
+                return
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError):
+            # Transient failure (connection, timeout, 5xx): keep polling, but slow down
+            delay = min(delay * 2, JOB_POLL_MAX)
+            continue
+        status = payload.get("status", job.status)
+        if status != job.status:
+            delay = JOB_POLL_INITIAL
+        else:
+            delay = min(delay * 2, JOB_POLL_MAX)
+        job.status = status
+        job.updated_at = time.time()
+        if status == "completed":
+            job.result = payload.get("result") or {}
+            return
+        if status == "failed":
+            job.error = payload.get("error") or "Analisi non riuscita."
+            return
+    job.status = "failed"
+    job.error = "Tempo massimo di attesa superato."
+    job.updated_at = time.time()
+
+
+def track_job(
+    job: Job,
+    headers: dict[str, str],
+    on_done: Callable[[Job], None] | None = None,
+) -> Job:
+    """Start a daemon thread polling ``job``; ``headers`` carry the caller's auth.
+
+    ``on_done`` is called with the job from the polling thread once it
+    reaches a terminal status.
+    """
+
+    def run() -> None:
+        try:
+            _poll(job, headers)
+        finally:
+            if on_done is not None:
+                on_done(job)
+
+    thread = threading.Thread(target=run, name=f"job-poll-{job.job_id}", daemon=True)
+    thread.start()
+    return job
@@ -5,7 +5,6 @@ import os
 
 import requests
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
 
 from firebase_handler import (
     create_user as firebase_create_user,
@@ -15,14 +14,9 @@ from firebase_handler import (
     send_password_reset_email,
     sign_in_with_email_and_password,
 )
-from api_client import auth_headers, backend_url
+import api_client
 from markdown_loader import load_markdown
-from styles import (
-    CARD_STYLE,
-    INPUT_STYLE,
-    WHITE_BUTTON_STYLE,
-    YELLOW_BUTTON_STYLE,
-)
+from theme import inject_theme, themed
 
 ACCESS_CODE = (
     st.secrets.get("TEST_PASSWORD")
@@ -36,16 +30,17 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
     # Gate di accesso molto semplice per consentire la registrazione solo con permesso
     if not st.session_state.get("access_granted"):
         st.markdown(load_markdown("login_style.md"), unsafe_allow_html=True)
+        inject_theme()
         st.title("Accesso controllato")
         col = st.columns([1, 1, 1])[1]
         with col:
-            with stylable_container(key="access_code_card", css_styles=CARD_STYLE):
+            with themed("card", "access_code_card"):
                 if not ACCESS_CODE:
                     st.warning("Codice di accesso non configurato. Imposta TEST_PASSWORD nel file .env")
-                with stylable_container(key="access_code_input", css_styles=INPUT_STYLE):
+                with themed("input", "access_code_input"):
                     code = st.text_input("Codice di accesso", type="password", key="access_code_input_val")
                 st.markdown("<br>", unsafe_allow_html=True)
-                with stylable_container(key="access_code_btn", css_styles=YELLOW_BUTTON_STYLE):
+                with themed("yellow-button", "access_code_btn"):
                     if st.button("Conferma", key="confirm_access_code", use_container_width=True):
                         if code == ACCESS_CODE:
                             st.session_state["access_granted"] = True
@@ -65,6 +60,7 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
             st.session_state["response"] = response
             st.rerun()
     st.markdown(load_markdown("login_style.md"), unsafe_allow_html=True)
+    inject_theme()
     st.title("Emanuense")
 
     # Center column for login form
@@ -72,14 +68,14 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
 
     @st.dialog("Registrati")
     def register_dialog() -> None:
-        with stylable_container(key="register_card", css_styles=CARD_STYLE):
+        with themed("card", "register_card"):
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="reg_email", css_styles=INPUT_STYLE):
+            with themed("input", "reg_email"):
                 reg_email = st.text_input("Email", key="reg_email_input")
-            with stylable_container(key="reg_password", css_styles=INPUT_STYLE):
+            with themed("input", "reg_password"):
                 reg_password = st.text_input("Password", type="password", key="reg_password_input")
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="reg_button", css_styles=YELLOW_BUTTON_STYLE):
+            with themed("yellow-button", "reg_button"):
                 if st.button("Crea", key="create_account"):
                     try:
                         firebase_create_user(reg_email, reg_password)
@@ -89,16 +85,16 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
 
     @st.dialog("Reimposta password")
     def forgot_dialog() -> None:
-        with stylable_container(key="forgot_card", css_styles=CARD_STYLE):
+        with themed("card", "forgot_card"):
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="forgot_email", css_styles=INPUT_STYLE):
+            with themed("input", "forgot_email"):
                 reset_email = st.text_input(
                     "Email",
                     key="reset_email_input",
                     placeholder="Email",
                 )
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="forgot_button", css_styles=YELLOW_BUTTON_STYLE):
+            with themed("yellow-button", "forgot_button"):
                 if st.button("Invia", key="send_reset"):
                     try:
                         send_password_reset_email(reset_email)
@@ -108,16 +104,16 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
 
     with col:  # noqa: SIM117
         # Stylable container gives us a white "card" with padding and shadow
-        with stylable_container(key="login_card", css_styles=CARD_STYLE):
+        with themed("card", "login_card"):
             st.markdown("### Accesso")
-            with stylable_container(key="email_input_scope", css_styles=INPUT_STYLE):
+            with themed("input", "email_input_scope"):
                 email = st.text_input(
                     "Email",
                     label_visibility="collapsed",
                     placeholder="Email",
                 )
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="password_input_scope", css_styles=INPUT_STYLE):
+            with themed("input", "password_input_scope"):
                 password = st.text_input(
                     "Password",
                     type="password",
@@ -127,7 +123,7 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
 
             # Small empty separator
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="acc_button_scope", css_styles=YELLOW_BUTTON_STYLE):
+            with themed("yellow-button", "acc_button_scope"):
                 if st.button("Accedi", use_container_width=True):
                     try:
                         # Authenticate with Firebase and store the ID token for API calls
@@ -141,11 +137,11 @@ def login(user_id: str = ""):  # noqa: C901, PLR0915
                         st.error("Errore durante l'autenticazione")
 
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="forgot_button_scope", css_styles=WHITE_BUTTON_STYLE):
+            with themed("white-button", "forgot_button_scope"):
                 if st.button("Password dimenticata", use_container_width=True):
                     forgot_dialog()
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="register_scope", css_styles=WHITE_BUTTON_STYLE):
+            with themed("white-button", "register_scope"):
                 if st.button("Registrati", use_container_width=True):
                     register_dialog()
 
@@ -154,10 +150,9 @@ def call_get_user_api(user_id: str) -> dict:
     """Call the FastAPI get_user endpoint with the user ID to retrieve user object."""
     try:
         # Send GET request to the get_user endpoint with user_id as query parameter
-        response = requests.get(
-            f"{backend_url()}/get_user",
-            params={"user_id": user_id},
-            headers=auth_headers(),
+        # Always asks the backend, but an unchanged document comes back as a 304
+        response = api_client.conditional_get(
+            "/get_user", params={"user_id": user_id}, user_id=user_id
         )
         response.raise_for_status()
         return json.loads(response.text)
@@ -1,10 +1,112 @@
-"""Utility to load markdown content for Streamlit pages."""
+"""Utility to load markdown content for Streamlit pages.
 
+Files in the markdown directory are read once at import and kept in memory.
+A file is re-read only when its modification time changes, and modification
+times are checked at most every ``MARKDOWN_CHECK_INTERVAL`` seconds, so page
+renders normally do no disk I/O.
+"""
+
+import os
+import threading
+import time
 from pathlib import Path
+from string import Formatter
 
 MARKDOWN_DIR = Path(__file__).parent / "markdown"
+# Seconds between modification-time checks of a cached file
+MARKDOWN_CHECK_INTERVAL = float(os.getenv("MARKDOWN_CHECK_INTERVAL", "2"))
+
+
+class MarkdownTemplate:
+    """A markdown file parsed once into literal text and ``{name}`` fields.
+
+    :meth:`format` behaves like :meth:`str.format` with keyword arguments;
+    templates using conversions, format specs or attribute access fall back
+    to :meth:`str.format` itself.
+    """
+
+    __slots__ = ("text", "_parts", "_simple")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._parts = list(Formatter().parse(text))
+        self._simple = all(
+            name is None or (name.isidentifier() and not spec and not conversion)
+            for _, name, spec, conversion in self._parts
+        )
+
+    def format(self, **fields) -> str:
+        """Return the template with ``fields`` substituted."""
+        if not self._simple:
+            return self.text.format(**fields)
+        out = []
+        for literal, name, _, _ in self._parts:
+            out.append(literal)
+            if name is not None:
+                out.append(str(fields[name]))
+        return "".join(out)
+
+
+class _Entry:
+    __slots__ = ("mtime", "checked", "text", "template")
+
+    def __init__(self, mtime: int, text: str) -> None:
+        self.mtime = mtime
+        self.checked = time.monotonic()
+        self.text = text
+        self.template: MarkdownTemplate | None = None
+
+
+_ENTRIES: dict[str, _Entry] = {}
+_LOCK = threading.Lock()
+
+
+def _read(filename: str) -> _Entry:
+    path = MARKDOWN_DIR / filename
+    mtime = path.stat().st_mtime_ns
+    return _Entry(mtime, path.read_text(encoding="utf-8"))
+
+
+def _entry(filename: str) -> _Entry:
+    """Return the cached entry of ``filename``, re-reading it if it changed on disk."""
+    entry = _ENTRIES.get(filename)
+    now = time.monotonic()
+    if entry is not None and now - entry.checked < MARKDOWN_CHECK_INTERVAL:
+        return entry
+    with _LOCK:
+        entry = _ENTRIES.get(filename)
+        if entry is None:
+            entry = _ENTRIES[filename] = _read(filename)
+        elif now - entry.checked >= MARKDOWN_CHECK_INTERVAL:
+            try:
+                mtime = (MARKDOWN_DIR / filename).stat().st_mtime_ns
+            except FileNotFoundError:
+                del _ENTRIES[filename]
+                raise
+            if mtime != entry.mtime:
+                entry = _ENTRIES[filename] = _read(filename)
+            else:
+                entry.checked = now
+        return entry
+
+
+def preload() -> None:
+    """Read every markdown file of the markdown directory into the cache."""
+    for path in MARKDOWN_DIR.glob("*.md"):
+        _entry(path.name)
 
 
 def load_markdown(filename: str) -> str:
     """Return the contents of a markdown file from the markdown directory."""
-    return (MARKDOWN_DIR / filename).read_text(encoding="utf-8")
+    return _entry(filename).text
+
+
+def load_template(filename: str) -> MarkdownTemplate:
+    """Return a markdown file as a pre-parsed :class:`MarkdownTemplate`."""
+    entry = _entry(filename)
+    if entry.template is None:
+        entry.template = MarkdownTemplate(entry.text)
+    return entry.template
+
+
+preload()
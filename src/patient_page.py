@@ -1,26 +1,53 @@
 """Patient streamlit page."""
 
+import contextlib
 import json
 import os
+import wave
+from collections.abc import Callable
 from datetime import UTC, datetime, time
+from time import sleep
 
 import requests
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
 
-from api_client import auth_headers, backend_url
+import api_client
+import search_index
+from audio_preprocess import downsampled_copy
+from jobs import Job, track_job
+from home_page import display_session_search
 from login import call_get_user_api
 from markdown_loader import load_markdown
-from styles import (
-    CARD_STYLE,
-    CHECKBOX_STYLE,
-    DELETE_SESSION_BUTTON_STYLE,
-    INPUT_STYLE,
-    SELECT_STYLE,
-    SMALL_CARD_STYLE,
-    WHITE_BUTTON_STYLE,
-    YELLOW_BUTTON_STYLE,
-)
+from patient_trends import PatientTrends, TrendPoint
+from recording_index import RecordingIndex, file_sha256
+from session_loader import fan_out
+from session_page import call_delete_session_api, forget_patient, forget_session
+from session_stats import SessionStats
+from theme import inject_theme, themed
+from transcript import Transcript
+from uploads import MultipartFileStream, ProgressCallback, resumable_upload
+
+# Whether the new-session dialog uses resumable chunked uploads by default
+RESUMABLE_UPLOADS_DEFAULT = os.getenv("RESUMABLE_UPLOADS", "").lower() in {"1", "true", "yes"}
+# Whether the new-session dialog converts WAV recordings to 16 kHz mono by default
+DOWNSAMPLE_WAV_DEFAULT = os.getenv("DOWNSAMPLE_WAV", "true").lower() in {"1", "true", "yes"}
+# Whether the new-session dialog submits background jobs by default
+ASYNC_JOBS_DEFAULT = os.getenv("ASYNC_JOBS", "").lower() in {"1", "true", "yes"}
+# Seconds between refreshes of the jobs panel while analyses are running
+JOBS_PANEL_REFRESH = float(os.getenv("JOBS_PANEL_REFRESH", "3"))
+
+# Batch ingestion: recordings uploaded in parallel and extra attempts per file
+BATCH_INGEST_CONCURRENCY = int(os.getenv("BATCH_INGEST_CONCURRENCY", "3"))
+BATCH_INGEST_RETRIES = int(os.getenv("BATCH_INGEST_RETRIES", "2"))
+
+AUDIO_EXTENSIONS = (".m4a", ".wav", ".mp3")
+
+JOB_STATUS_LABELS = {
+    "queued": "In coda",
+    "running": "In corso",
+    "completed": "Completata",
+    "failed": "Non riuscita",
+}
 
 
 def call_transcription_api(
@@ -29,8 +56,32 @@ def call_transcription_api(
     uploaded_audio_name: str,
     session_datetime: str,
     framework: str,
+    progress_callback: ProgressCallback | None = None,
+    resumable: bool = False,
+    as_job: bool = False,
+    headers: dict[str, str] | None = None,
+    downsample: bool = False,
+    on_downsampled: Callable[[int, int], None] | None = None,
 ) -> dict:
-    """Call the FastAPI process_audio endpoint with uploaded audio and user ID."""
+    """Call the FastAPI process_audio endpoint with uploaded audio and user ID.
+
+    The recording is streamed from disk in chunks; ``progress_callback`` is
+    called with ``(bytes_sent, total_bytes)`` while it uploads. With
+    ``resumable`` the file is sent as acknowledged parts that survive dropped
+    connections (see :func:`uploads.resumable_upload`). With ``as_job`` the
+    backend queues the analysis and answers at once with a ``job_id``.
+    Pass ``headers`` when calling from a worker thread.
+
+    Recordings are hashed first: one already analysed for this patient is not
+    sent again and ``{"transcription_id": ..., "duplicate": True}`` is
+    returned instead. A submitted job keeps the recording claimed until
+    :func:`finish_recording_job` runs for it, so the same recording cannot be
+    sent again while it is being analysed.
+
+    With ``downsample`` a PCM WAV is converted to 16 kHz mono before upload
+    and ``on_downsampled`` receives ``(original_bytes, converted_bytes)``;
+    other formats are sent unchanged.
+    """
     try:
         # Split file name into name and extension
         name_without_ext, extension = os.path.splitext(uploaded_audio_name)
@@ -38,40 +89,120 @@ def call_transcription_api(
         test_audio_dir = os.getenv("TEST_AUDIO_DIR")
         if not test_audio_dir:
             raise ValueError("Missing environment variable: test_audio_dir")
-        # Open the audio file and fill in the files data
         audio_path = os.path.join(test_audio_dir, uploaded_audio_name)
-        with open(audio_path, "rb") as audio_file:
-            uploaded_audio = audio_file.read()
-        # Prepare the audio file and form data to send to the API
-        files = {"audio_file": (name_without_ext, uploaded_audio, extension)}
         data = {
             "user_id": user_id,
             "patient_id": patient_id,
             "session_datetime": session_datetime,
             "framework": framework,
         }
-
-        # Send POST request to the process_audio endpoint
-        response = requests.post(
-            f"{backend_url()}/process_audio",
-            files=files,
-            data=data,
-            headers=auth_headers(),
-        )
-        response.raise_for_status()
-        return response.json()
+        if as_job:
+            data["as_job"] = "true"
+        digest = file_sha256(audio_path)
+        existing = RecordingIndex.lookup(patient_id, digest)
+        if existing:
+            return {"transcription_id": existing, "duplicate": True}
+        if not RecordingIndex.claim(patient_id, digest):
+            return {"error": "Questa registrazione è già in fase di caricamento."}
+        # An upload holding the claim may have finished between lookup and claim
+        existing = RecordingIndex.lookup(patient_id, digest)
+        if existing:
+            RecordingIndex.release(patient_id, digest)
+            return {"transcription_id": existing, "duplicate": True}
+        upload_path = audio_path
+        result = None
+        try:
+            if downsample and extension.lower() == ".wav":
+                try:
+                    upload_path, original_bytes, converted_bytes = downsampled_copy(
+                        audio_path, digest
+                    )
+                except (wave.Error, ValueError, EOFError):
+                    pass  # not a PCM WAV: upload the original
+                else:
+                    if on_downsampled is not None:
+                        on_downsampled(original_bytes, converted_bytes)
+            if resumable:
+                result = resumable_upload(
+                    upload_path,
+                    fields=data,
+                    filename=name_without_ext,
+                    content_type=extension,
+                    progress_callback=progress_callback,
+                    headers=headers,
+                )
+            else:
+                result = _post_recording(
+                    upload_path,
+                    data,
+                    name_without_ext,
+                    extension,
+                    progress_callback=progress_callback,
+                    as_job=as_job,
+                    headers=headers,
+                )
+        finally:
+            if result is None or "job_id" not in result:
+                RecordingIndex.release(patient_id, digest)
+            # A failed resumable upload keeps its conversion so a retry resumes
+            # the same file; downsampled_copy purges copies left behind
+            if upload_path != audio_path and (result is not None or not resumable):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(upload_path)
+        if result.get("transcription_id"):
+            RecordingIndex.register(patient_id, digest, result["transcription_id"])
+        # Jobs register their transcription once they complete
+        result["recording_sha256"] = digest
+        return result
     except requests.RequestException as e:
         # Catch and return any API or connection error
         return {"error": str(e)}
 
 
-def get_transcription_api_call(transcription_id: str) -> dict:
+def _post_recording(
+    audio_path: str,
+    data: dict[str, str],
+    filename: str,
+    extension: str,
+    progress_callback: ProgressCallback | None = None,
+    as_job: bool = False,
+    headers: dict[str, str] | None = None,
+) -> dict:
+    """Stream one recording to ``process_audio`` (or ``process_audio_job``)."""
+    # Multipart body streamed from disk instead of reading the whole file
+    with MultipartFileStream(
+        fields=data,
+        file_field="audio_file",
+        path=audio_path,
+        filename=filename,
+        content_type=extension,
+        progress_callback=progress_callback,
+    ) as body:
+        # Send POST request to the process_audio endpoint
+        # Transcription can take minutes: keep the connect timeout, no read timeout
+        response = api_client.post(
+            "/process_audio_job" if as_job else "/process_audio",
+            data=body,
+            headers={**(headers or {}), "Content-Type": body.content_type},
+            timeout=(api_client.CONNECT_TIMEOUT, None),
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+def get_transcription_api_call(
+    transcription_id: str,
+    headers: dict[str, str] | None = None,
+    user_id: str | None = None,
+) -> dict:
     """Call the API to get session details."""
     try:
-        response = requests.get(
-            f"{backend_url()}/get_transcription",
+        response = api_client.cached_get(
+            "/get_transcription",
             params={"transcription_id": transcription_id},
-            headers=auth_headers(),
+            headers=headers,
+            user_id=user_id,
+            ttl=api_client.TRANSCRIPT_CACHE_TTL,
         )
         response.raise_for_status()
         return json.loads(response.json())
@@ -79,13 +210,18 @@ def get_transcription_api_call(transcription_id: str) -> dict:
         return {"error": str(e)}
     
 
-def get_framework_summary_api_call(transcription_id: str) -> dict:
+def get_framework_summary_api_call(
+    transcription_id: str,
+    headers: dict[str, str] | None = None,
+    user_id: str | None = None,
+) -> dict:
     """Fetch the framework-based summary for a session."""
     try:
-        response = requests.get(
-            f"{backend_url()}/get_framework_summary",
+        response = api_client.cached_get(
+            "/get_framework_summary",
             params={"transcription_id": transcription_id},
-            headers=auth_headers(),
+            headers=headers,
+            user_id=user_id,
         )
         response.raise_for_status()
         return json.loads(response.json())
@@ -93,31 +229,12 @@ def get_framework_summary_api_call(transcription_id: str) -> dict:
         return {"error": str(e)}
 
 
-def call_delete_session_api(user_id: str, patient_id: str, session_id: str) -> dict:
-    """Call API to delete a session."""
-    try:
-        resp = requests.delete(
-            f"{backend_url()}/delete_session",
-            params={
-                "user_id": user_id,
-                "patient_id": patient_id,
-                "session_id": session_id,
-            },
-            headers=auth_headers(),
-        )
-        resp.raise_for_status()
-        return resp.json()
-    except requests.RequestException as e:
-        return {"error": str(e)}
-
-
 def call_delete_patient_api(user_id: str, patient_id: str) -> dict:
     """Call API to delete a patient."""
     try:
-        resp = requests.delete(
-            f"{backend_url()}/delete_patient",
+        resp = api_client.delete(
+            "/delete_patient",
             params={"user_id": user_id, "patient_id": patient_id},
-            headers=auth_headers(),
         )
         resp.raise_for_status()
         return resp.json()
@@ -125,30 +242,303 @@ def call_delete_patient_api(user_id: str, patient_id: str) -> dict:
         return {"error": str(e)}
 
 
-def compute_session_analytics(session_id: str) -> dict:
-    """Compute basic analytics for a session."""
-    transcript = get_transcription_api_call(session_id)
-    # if isinstance(transcript, str):
-    #    transcript = json.loads(transcript)
+def compute_session_analytics(
+    session_id: str,
+    headers: dict[str, str] | None = None,
+    user_id: str | None = None,
+    patient_id: str = "",
+) -> dict:
+    """Return basic analytics for a session.
+
+    Stats are read from the session-stats store; the full transcript is only
+    downloaded (and the store filled and the session indexed for search) the
+    first time a session is seen.
+    """
+    stored = SessionStats.load_current(session_id)
+    if stored is not None:
+        return stored.model_dump()
+    transcript = get_transcription_api_call(session_id, headers=headers, user_id=user_id)
     if "error" in transcript:
         return {"word_count": 0, "duration": 0}
-    words = transcript["data"]["words"]
-    duration = max((w["end"] for w in words), default=0)
-    return {"word_count": len(words), "duration": duration}
+    transcript = Transcript.from_payload(transcript)
+    stats = SessionStats.from_transcript(transcript)
+    SessionStats.save_stats(session_id, stats)
+    if user_id:
+        search_index.index_transcript(user_id, session_id, patient_id, transcript)
+    return stats.model_dump()
+
+
+def record_new_session_stats(
+    response_data: dict,
+    headers: dict[str, str] | None = None,
+    user_id: str | None = None,
+    patient_id: str = "",
+) -> None:
+    """Fill the session-stats store and search index for a session just returned by ``process_audio``."""
+    transcription_id = response_data.get("transcription_id")
+    if not transcription_id:
+        return
+    user_id = user_id or api_client.current_user_id()
+    transcript = get_transcription_api_call(transcription_id, headers=headers, user_id=user_id)
+    if "error" not in transcript:
+        transcript = Transcript.from_payload(transcript)
+        SessionStats.record(transcription_id, transcript)
+        if user_id:
+            search_index.index_transcript(user_id, transcription_id, patient_id, transcript)
+
+
+def list_audio_files() -> list[str]:
+    """Return recordings available in ``TEST_AUDIO_DIR``, reporting problems in the UI."""
+    demo_dir = (
+        st.secrets.get("TEST_AUDIO_DIR")
+        if hasattr(st, "secrets") and "TEST_AUDIO_DIR" in st.secrets
+        else os.getenv("TEST_AUDIO_DIR") or ""
+    )
+    audio_files: list[str] = []
+    if not demo_dir:
+        st.error("TEST_AUDIO_DIR non è impostata. Definiscila nel file .env.")
+    elif not os.path.isdir(demo_dir):
+        st.error(f"TEST_AUDIO_DIR non esiste: {demo_dir}")
+    else:
+        try:
+            audio_files = sorted(
+                f for f in os.listdir(demo_dir) if f.lower().endswith(AUDIO_EXTENSIONS)
+            )
+        except OSError as e:  # permission or other fs errors
+            st.error(f"Impossibile elencare TEST_AUDIO_DIR ({demo_dir}): {e}")
+    return audio_files
+
+
+def ingest_recordings(
+    user_id: str,
+    patient_id: str,
+    file_names: list[str],
+    framework: str,
+    concurrency: int = BATCH_INGEST_CONCURRENCY,
+    retries: int = BATCH_INGEST_RETRIES,
+    downsample: bool = False,
+):
+    """Upload many recordings through :func:`call_transcription_api` concurrently.
+
+    At most ``concurrency`` uploads run at once and each file is retried up to
+    ``retries`` more times with backoff. The session datetime of each file is
+    its modification time. Yields ``(file_name, result)`` as files finish;
+    ``result`` is the ``process_audio`` response (or ``{"error": ...}``) plus
+    an ``attempts`` count. The user document is not refreshed here.
+    """
+    headers = api_client.auth_headers()
+    audio_dir = os.getenv("TEST_AUDIO_DIR", "")
+
+    def ingest(file_name: str) -> dict:
+        mtime = os.path.getmtime(os.path.join(audio_dir, file_name))
+        session_datetime = datetime.fromtimestamp(mtime, UTC).isoformat(timespec="hours")
+        for attempt in range(1, retries + 2):
+            result = call_transcription_api(
+                user_id=user_id,
+                patient_id=patient_id,
+                uploaded_audio_name=file_name,
+                session_datetime=session_datetime,
+                framework=framework,
+                headers=headers,
+                downsample=downsample,
+            )
+            if "error" not in result:
+                if not result.get("duplicate"):
+                    record_new_session_stats(
+                        result, headers=headers, user_id=user_id, patient_id=patient_id
+                    )
+                break
+            if attempt <= retries:
+                sleep(min(2**attempt, 30))
+        return {**result, "attempts": attempt}
+
+    yield from fan_out(ingest, file_names, max_workers=concurrency)
+
+
+def display_batch_report() -> None:
+    """Show the per-file outcome of the last batch import, once."""
+    report = st.session_state.pop("batch_ingest_report", None)
+    if not report:
+        return
+    failed = sum(1 for row in report if row["Esito"].startswith("Non riuscita"))
+    with st.expander(
+        f"Ultima importazione: {len(report) - failed} importate, {failed} non riuscite",
+        expanded=bool(failed),
+    ):
+        st.table(report)
+
+
+def iter_session_list_data(session_ids, patient_id: str = ""):
+    """Yield ``(session_id, kind, result)`` for each session as data arrives.
+
+    ``kind`` is ``"stats"`` (shape of :func:`compute_session_analytics`) or
+    ``"summary"`` (shape of :func:`get_framework_summary_api_call`). Calls run
+    concurrently; failed stats fall back to zeroes and failed summaries to an
+    ``{"error": ...}`` dict. Fetched summaries are added to the search index.
+    """
+    # Worker threads have no script run context: capture the token and user here
+    headers = api_client.auth_headers()
+    user_id = api_client.current_user_id()
+    tasks = [(sid, kind) for sid in session_ids for kind in ("stats", "summary")]
+
+    def fetch(task):
+        session_id, kind = task
+        if kind == "stats":
+            return compute_session_analytics(
+                session_id, headers=headers, user_id=user_id, patient_id=patient_id
+            )
+        summary = get_framework_summary_api_call(session_id, headers=headers, user_id=user_id)
+        if user_id:
+            search_index.index_framework_summary(user_id, session_id, patient_id, summary)
+        return summary
+
+    for (session_id, kind), result in fan_out(fetch, tasks):
+        if kind == "stats" and "error" in result:
+            result = {"word_count": 0, "duration": 0}
+        yield session_id, kind, result
+
+
+def render_session_summary(summary: dict) -> None:
+    """Render a framework summary inside the current container."""
+    summary_text = summary.get("summary") if "error" not in summary else None
+    framework_name = summary.get("framework") if "error" not in summary else None
+    if summary_text:
+        title = (
+            f"Riassunto con framework {framework_name}"
+            if framework_name
+            else "Riassunto con framework"
+        )
+        st.markdown(f"**{title}**")
+        st.markdown(summary_text)
+    else:
+        st.write("No summary available.")
+
+
+def render_session_stats(stats: dict | None) -> None:
+    """Render per-session metrics; ``None`` shows a loading state."""
+    sc1, sc2, sc3 = st.columns(3)
+    if stats is None:
+        sc1.metric("Words", "…")
+        sc2.metric("Duration (s)", "…")
+        sc3.metric("Patient talk", "…")
+        return
+    sc1.metric("Words", stats["word_count"])
+    sc2.metric("Duration (s)", round(stats["duration"], 1))
+    summary = SessionStats(**stats)
+    sc3.metric("Patient talk", f"{summary.patient_share:.0%}" if summary.talk_time else "–")
+
+
+def display_trend_chart(trends: PatientTrends) -> None:
+    """Draw words, length and patient talk share per session over time."""
+    rows = trends.series()
+    if len(rows) < 2:
+        st.caption("Le tendenze appaiono dalla seconda seduta analizzata.")
+        return
+    try:  # Import locally to avoid hard dependency during tests
+        import altair as alt
+    except ModuleNotFoundError:  # pragma: no cover - chart is optional
+        st.write("Altair è necessario per visualizzare le tendenze.")
+        return
+    values = [
+        {
+            "datetime": row["datetime"],
+            "Parole": row["word_count"],
+            "Durata (min)": round(row["duration"] / 60, 1),
+            "Quota paziente (%)": round(row["patient_share"] * 100, 1),
+        }
+        for row in rows
+    ]
+    chart = (
+        alt.Chart(alt.Data(values=values))
+        .transform_fold(["Parole", "Durata (min)", "Quota paziente (%)"], as_=["metric", "value"])
+        .mark_line(point=True, color="#ffd400")
+        .encode(
+            x=alt.X("datetime:T", title="Seduta"),
+            y=alt.Y("value:Q", title=None),
+            tooltip=["datetime:T", "metric:N", "value:Q"],
+        )
+        .properties(height=120)
+        .facet(row=alt.Row("metric:N", title=None))
+        .resolve_scale(y="independent")
+        .configure_axis(labelColor="#000", titleColor="#000")
+        .configure_view(strokeWidth=0)
+        .configure(background="#ffffff")
+    )
+    st.subheader("Andamento")
+    st.altair_chart(chart, use_container_width=True)
+
+
+def finish_recording_job(job: Job) -> None:
+    """Index the recording of a finished job and release its upload claim."""
+    if not job.recording_sha256:
+        return
+    try:
+        if job.status == "completed" and job.result and job.result.get("transcription_id"):
+            RecordingIndex.register(
+                job.patient_id, job.recording_sha256, job.result["transcription_id"]
+            )
+    finally:
+        RecordingIndex.release(job.patient_id, job.recording_sha256)
+
+
+def apply_finished_job(job: Job) -> None:
+    """Reflect a completed job in the app: fill its stats and refresh the user document."""
+    job.applied = True
+    if job.status == "completed" and job.result:
+        record_new_session_stats(job.result, patient_id=job.patient_id)
+    user_id = st.session_state.get("user_id")
+    if user_id and job.status == "completed":
+        refreshed = call_get_user_api(user_id)
+        st.session_state["response"] = (
+            refreshed if isinstance(refreshed, dict) else json.loads(refreshed)
+        )
+
+
+def display_jobs_panel(patient_id: str) -> None:
+    """Show the background analyses submitted for ``patient_id``."""
+    jobs = [j for j in st.session_state.get("jobs", {}).values() if j.patient_id == patient_id]
+    if not jobs:
+        return
+    running = any(not job.done for job in jobs)
+
+    @st.fragment(run_every=JOBS_PANEL_REFRESH if running else None)
+    def jobs_panel() -> None:
+        finished = [job for job in jobs if job.done and not job.applied]
+        if finished:
+            for job in finished:
+                apply_finished_job(job)
+            st.rerun(scope="app")  # redraw the session list with the new sessions
+        with themed("small-card", "jobs_panel_card"):
+            st.subheader("Analisi")
+            for job in sorted(jobs, key=lambda j: j.submitted_at, reverse=True):
+                elapsed = int(job.updated_at - job.submitted_at)
+                status = JOB_STATUS_LABELS.get(job.status, job.status)
+                st.write(f"**{job.label}** — {status} ({elapsed} s)")
+                if job.error:
+                    st.caption(job.error)
+            if not running:
+                with themed("white-button", "jobs_clear_btn"):
+                    if st.button("Rimuovi completate", key="clear_finished_jobs"):
+                        for job in jobs:
+                            st.session_state["jobs"].pop(job.job_id, None)
+                        st.rerun(scope="app")
+
+    jobs_panel()
 
 
 def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
     """Render a patient page."""
     st.markdown(load_markdown("login_style.md"), unsafe_allow_html=True)
+    inject_theme()
     # Action bar: Back + Refresh (left), Delete Patient + My Account (right)
     action_left, action_right = st.columns([3, 2])
     with action_left:
         left1, left2, _left_spacer = st.columns([1, 1, 6])
-        with left1, stylable_container(key="back_scope", css_styles=WHITE_BUTTON_STYLE):
+        with left1, themed("white-button", "back_scope"):
             if st.button("Indietro"):
                 st.session_state["page"] = "home_page"
                 st.rerun()
-        with left2, stylable_container(key="refresh_scope_patient", css_styles=WHITE_BUTTON_STYLE):
+        with left2, themed("white-button", "refresh_scope_patient"):
             if st.button("Aggiorna"):
                 user_id = st.session_state.get("user_id")
                 if user_id:
@@ -159,16 +549,20 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
                     st.rerun()
     with action_right:
         _right_spacer, right1, right2 = st.columns([4, 2, 2])
-        with right1, stylable_container(key="delete_patient_scope", css_styles=DELETE_SESSION_BUTTON_STYLE):
+        with right1, themed("delete-button", "delete_patient_scope"):
             if st.button("Elimina paziente", use_container_width=True):
-                resp = call_delete_patient_api(st.session_state.get("user_id", ""), patient_id)
+                patients = st.session_state.get("response", {}).get("patient_dir", {})
+                session_ids = list(patients.get(patient_id, {}).get("items", {}))
+                user_id = st.session_state.get("user_id", "")
+                resp = call_delete_patient_api(user_id, patient_id)
                 if "error" in resp:
                     st.error(f"Eliminazione non riuscita: {resp['error']}")
                 else:
+                    forget_patient(user_id, patient_id, session_ids)
                     st.success("Paziente eliminato")
                     st.session_state["page"] = "home_page"
                     st.rerun()
-        with right2, stylable_container(key="account_scope", css_styles=WHITE_BUTTON_STYLE):
+        with right2, themed("white-button", "account_scope"):
             if st.button("Il mio account", use_container_width=True):
                 st.session_state["page"] = "account_page"
                 st.rerun()
@@ -185,32 +579,14 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
     @st.dialog("Nuova seduta")
     def new_session_dialog():
         # Card style inside dialog
-        with stylable_container(key="new_session_card", css_styles=CARD_STYLE):
+        with themed("card", "new_session_card"):
             # Demo / file selection (keeps existing logic)
             if (
                 (st.secrets.get("MODE") if hasattr(st, "secrets") else os.getenv("MODE"))
                 == "demo"
             ):
-                demo_dir = (
-                    st.secrets.get("TEST_AUDIO_DIR")
-                    if hasattr(st, "secrets") and "TEST_AUDIO_DIR" in st.secrets
-                    else os.getenv("TEST_AUDIO_DIR") or ""
-                )
-                audio_files: list[str] = []
-                if not demo_dir:
-                    st.error("TEST_AUDIO_DIR non è impostata. Definiscila nel file .env.")
-                elif not os.path.isdir(demo_dir):
-                    st.error(f"TEST_AUDIO_DIR non esiste: {demo_dir}")
-                else:
-                    try:
-                        audio_files = [
-                            f
-                            for f in os.listdir(demo_dir)
-                            if f.lower().endswith((".m4a", ".wav", ".mp3"))
-                        ]
-                    except OSError as e:  # permission or other fs errors
-                        st.error(f"Impossibile elencare TEST_AUDIO_DIR ({demo_dir}): {e}")
-                with stylable_container(key="new_session_select", css_styles=SELECT_STYLE):
+                audio_files = list_audio_files()
+                with themed("select", "new_session_select"):
                     selected_audio = st.selectbox(
                         "Seleziona un file audio",
                         audio_files if audio_files else ["(nessun file audio trovato)"]
@@ -218,31 +594,90 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
 
             now = datetime.now(UTC)
             default_time = time(hour=now.hour)
-            with stylable_container(key="new_session_datetime", css_styles=INPUT_STYLE):
+            with themed("input", "new_session_datetime"):
                 st.markdown("<br><br>", unsafe_allow_html=True)
                 date_val = st.date_input("Data seduta", value=now.date())
                 time_val = st.time_input("Ora seduta", value=default_time, step=3600)
             session_datetime = datetime.combine(date_val, time_val).isoformat(timespec="hours")
 
             st.markdown("<br>", unsafe_allow_html=True)
-            with stylable_container(key="consent_checkbox", css_styles=CHECKBOX_STYLE):
+            with themed("checkbox", "consent_checkbox"):
                 accept_processing = st.checkbox(
                     "Accetto il trattamento dei dati durante questa seduta", value=True
                 )
+                resumable = st.checkbox(
+                    "Caricamento a blocchi (riprende dopo un'interruzione)",
+                    value=RESUMABLE_UPLOADS_DEFAULT,
+                )
+                as_job = st.checkbox(
+                    "Analizza in background (puoi continuare a lavorare)",
+                    value=ASYNC_JOBS_DEFAULT,
+                )
+                downsample = st.checkbox(
+                    "Riduci i file WAV a 16 kHz mono prima dell'invio",
+                    value=DOWNSAMPLE_WAV_DEFAULT,
+                )
             # Yellow action button
-            with stylable_container(key="new_session_start_btn", css_styles=YELLOW_BUTTON_STYLE):
+            with themed("yellow-button", "new_session_start_btn"):
                 if st.button("Avvia analisi", key="start_analysis_dialog"):
                     if not accept_processing:
                         st.warning("Accetta i termini di trattamento dei dati per continuare.")
                     else:
                         st.write("Invio audio per l'analisi…")
+                        upload_bar = st.progress(0.0, text="Caricamento audio…")
+                        shown = {"pct": -1}
+
+                        def on_upload_progress(sent: int, total: int) -> None:
+                            pct = int(sent * 100 / total) if total else 100
+                            if pct != shown["pct"]:  # one frontend update per percent
+                                shown["pct"] = pct
+                                upload_bar.progress(
+                                    pct / 100,
+                                    text=(
+                                        f"Caricamento audio… {pct}% "
+                                        f"({sent / 1_048_576:.1f} / {total / 1_048_576:.1f} MB)"
+                                    ),
+                                )
+                            if sent >= total:
+                                upload_bar.progress(1.0, text="Audio caricato, analisi in corso…")
+
+                        def on_downsampled(original: int, converted: int) -> None:
+                            saved = 1 - converted / original if original else 0
+                            st.caption(
+                                f"Audio ridotto da {original / 1_048_576:.1f} MB a "
+                                f"{converted / 1_048_576:.1f} MB (-{saved:.0%})"
+                            )
+
                         response_data = call_transcription_api(
                             user_id=st.session_state["user_id"],
                             patient_id=patient_id,
                             uploaded_audio_name=selected_audio,
                             session_datetime=session_datetime,
-                            framework=patient.get("framework", "")
+                            framework=patient.get("framework", ""),
+                            progress_callback=on_upload_progress,
+                            resumable=resumable,
+                            as_job=as_job,
+                            downsample=downsample,
+                            on_downsampled=on_downsampled,
                         )
+                        if as_job and "job_id" in response_data:
+                            job = Job(
+                                job_id=response_data["job_id"],
+                                patient_id=patient_id,
+                                label=f"{selected_audio} - {session_datetime}",
+                                recording_sha256=response_data.get("recording_sha256"),
+                            )
+                            st.session_state.setdefault("jobs", {})[job.job_id] = job
+                            track_job(
+                                job, api_client.auth_headers(), on_done=finish_recording_job
+                            )
+                            st.rerun()  # closes dialog; progress shows in the jobs panel
+                        if response_data.get("duplicate"):
+                            st.info(
+                                "Questa registrazione è già stata analizzata per questo "
+                                f"paziente (seduta {response_data['transcription_id']})."
+                            )
+                            return
                         st.session_state["response"] = json.loads(
                             call_get_user_api(st.session_state["user_id"])  # refresh
                         )
@@ -250,14 +685,112 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
                             st.error("Trascrizione non riuscita.")
                             st.text(response_data["error"])
                         else:
+                            record_new_session_stats(response_data, patient_id=patient_id)
                             st.success("Trascrizione completata con successo.")
                             st.json(response_data)
                         st.rerun()  # closes dialog
 
-    # Trigger button above sessions list
-    with stylable_container(key="new_session_btn", css_styles=YELLOW_BUTTON_STYLE):
+    @st.dialog("Importa sedute")
+    def batch_ingest_dialog():
+        with themed("card", "batch_ingest_card"):
+            audio_files = list_audio_files()
+            with themed("checkbox", "batch_ingest_all"):
+                select_all = st.checkbox("Tutti i file di TEST_AUDIO_DIR", value=False)
+            if select_all:
+                selected_files = audio_files
+                st.write(f"{len(audio_files)} file selezionati")
+            else:
+                with themed("select", "batch_ingest_select"):
+                    selected_files = st.multiselect("Seleziona i file audio", audio_files)
+            with themed("input", "batch_ingest_options"):
+                concurrency = st.number_input(
+                    "Caricamenti in parallelo", min_value=1, max_value=8,
+                    value=BATCH_INGEST_CONCURRENCY,
+                )
+                retries = st.number_input(
+                    "Tentativi aggiuntivi per file", min_value=0, max_value=5,
+                    value=BATCH_INGEST_RETRIES,
+                )
+            st.caption("La data di ogni seduta è la data di modifica del file.")
+            with themed("checkbox", "batch_consent_checkbox"):
+                accept_processing = st.checkbox(
+                    "Accetto il trattamento dei dati per queste sedute", value=True
+                )
+                downsample = st.checkbox(
+                    "Riduci i file WAV a 16 kHz mono prima dell'invio",
+                    value=DOWNSAMPLE_WAV_DEFAULT,
+                    key="batch_downsample",
+                )
+            with themed("yellow-button", "batch_ingest_start_btn"):
+                if st.button("Avvia importazione", key="start_batch_ingest"):
+                    if not accept_processing:
+                        st.warning("Accetta i termini di trattamento dei dati per continuare.")
+                    elif not selected_files:
+                        st.warning("Seleziona almeno un file audio.")
+                    else:
+                        statuses = {name: "In attesa" for name in selected_files}
+                        attempts = dict.fromkeys(selected_files, 0)
+                        progress = st.progress(0.0, text="Importazione in corso…")
+
+                        def report_rows() -> list[dict]:
+                            return [
+                                {"File": n, "Esito": s, "Tentativi": attempts[n]}
+                                for n, s in statuses.items()
+                            ]
+
+                        table = st.empty()
+                        table.table(report_rows())
+                        for done, (name, result) in enumerate(
+                            ingest_recordings(
+                                user_id=st.session_state["user_id"],
+                                patient_id=patient_id,
+                                file_names=selected_files,
+                                framework=patient.get("framework", ""),
+                                concurrency=int(concurrency),
+                                retries=int(retries),
+                                downsample=downsample,
+                            ),
+                            start=1,
+                        ):
+                            if "error" in result:
+                                statuses[name] = f"Non riuscita: {result['error']}"
+                            elif result.get("duplicate"):
+                                statuses[name] = "Già presente"
+                            else:
+                                statuses[name] = "Completata"
+                            attempts[name] = result.get("attempts", 1)
+                            table.table(report_rows())
+                            progress.progress(
+                                done / len(selected_files),
+                                text=f"Importate {done} / {len(selected_files)}",
+                            )
+                        # One refresh of the user document for the whole batch
+                        refreshed = call_get_user_api(st.session_state["user_id"])
+                        st.session_state["response"] = (
+                            refreshed if isinstance(refreshed, dict) else json.loads(refreshed)
+                        )
+                        st.session_state["batch_ingest_report"] = report_rows()
+                        st.rerun()  # closes dialog
+
+    # Trigger buttons above sessions list
+    new_col, batch_col, _spacer = st.columns([1, 1, 6])
+    with new_col, themed("yellow-button", "new_session_btn"):
         if st.button("Nuova Seduta", key="open_new_session"):
             new_session_dialog()
+    with batch_col, themed("white-button", "batch_ingest_btn"):
+        if st.button("Importa sedute", key="open_batch_ingest"):
+            batch_ingest_dialog()
+
+    display_batch_report()
+    display_jobs_panel(patient_id)
+
+    with themed("card", "patient_search_card"):
+        display_session_search(
+            st.session_state.get("user_id", ""),
+            patients,
+            patient_id=patient_id,
+            key="patient_session_search",
+        )
 
 
     # Display patient details
@@ -267,81 +800,69 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
             if patient_id in patients:
                 patient = patients[patient_id]
                 sessions = patient["items"]
-                session_stats = {}
-                total_words = 0
-                total_duration = 0
-                for session_id in sessions:
-                    stats = compute_session_analytics(session_id)
-                    session_stats[session_id] = stats
-                    total_words += stats["word_count"]
-                    total_duration += stats["duration"]
-
                 sorted_sessions = sorted(
                     sessions.items(),
                     key=lambda kv: kv[1].get("datetime", ""),
                     reverse=True,
                 )
 
-                with stylable_container(key="patient_analytics_card", css_styles=CARD_STYLE):
+                # Draw every card from the metadata we already hold, then fill
+                # the placeholders as per-session data arrives.
+                summary_slots = {}
+                stats_slots = {}
+                # Stored per-session aggregates: totals and trends are known at once
+                trends = PatientTrends.load_trends(patient_id)
+                trends_changed = False
+                for stale_id in set(trends.points) - set(sessions):
+                    trends_changed |= trends.remove(stale_id)
+                trends_complete = set(trends.points) == set(sessions)
+                with themed("card", "patient_analytics_card"):
                     st.subheader("Sedute")
                     col1, col2, col3 = st.columns(3)
 
                     col1.metric("Sedute", len(sessions))
-                    col2.metric("Parole totali", total_words)
-                    col3.metric("Durata totale (s)", round(total_duration, 1))
+                    total_words_slot = col2.empty()
+                    total_duration_slot = col3.empty()
+                    total_words_slot.metric(
+                        "Parole totali", trends.total_words if trends_complete else "…"
+                    )
+                    total_duration_slot.metric(
+                        "Durata totale (s)",
+                        round(trends.total_duration, 1) if trends_complete else "…",
+                    )
+                    trend_slot = st.empty()
+                    with trend_slot.container():
+                        display_trend_chart(trends)
 
                     for session_id, session in sorted_sessions:
-                        stats = session_stats.get(session_id, {"word_count": 0, "duration": 0})
                         dt_str = session.get("datetime")
                         display_dt = (
                             datetime.fromisoformat(dt_str).strftime("%Y-%m-%d %H:00")
                             if dt_str
                             else "N/A"
                         )
-                        summary = get_framework_summary_api_call(session_id)
-                        summary_text = summary.get("summary") if "error" not in summary else None
-                        framework_name = (
-                            summary.get("framework") if "error" not in summary else None
-                        )
                         with (
-                            stylable_container(
-                                key=f"session_card_{session_id}",
-                                css_styles=SMALL_CARD_STYLE,
-                            ),
+                            themed("small-card", f"session_card_{session_id}"),
                             st.expander(
                                 f"{session.get('type', 'Sessione')} - {display_dt}",
                                 expanded=True,
                             ),
                         ):
                             st.write(f"ID: {session_id}")
-                            if summary_text:
-                                title = (
-                                    f"Riassunto con framework {framework_name}"
-                                    if framework_name
-                                    else "Riassunto con framework"
-                                )
-                                st.markdown(f"**{title}**")
-                                st.markdown(summary_text)
-                            else:
-                                st.write("No summary available.")
-                            sc1, sc2 = st.columns(2)
-                            sc1.metric("Words", stats["word_count"])
-                            sc2.metric("Duration (s)", round(stats["duration"], 1))
+                            summary_slots[session_id] = st.empty()
+                            summary_slots[session_id].caption("Caricamento riassunto…")
+                            stats_slots[session_id] = st.empty()
+                            with stats_slots[session_id].container():
+                                render_session_stats(None)
                             btn_left, btn_right = st.columns([1, 1])
                             with btn_left:
-                                with stylable_container(
-                                    key=f"open_session_btn_{session_id}",
-                                    css_styles=YELLOW_BUTTON_STYLE,
-                                ):
+                                with themed("yellow-button", f"open_session_btn_{session_id}"):
                                     if st.button("Apri seduta", key=session_id):
                                         st.session_state["page"] = "session_page"
                                         st.session_state["selected_session_id"] = session_id
                                         st.rerun()
                             with btn_right:
-                                with stylable_container(
-                                    key=f"delete_session_btn_{session_id}",
-                                    css_styles=DELETE_SESSION_BUTTON_STYLE,
-                                ):
+                                with themed("delete-button", f"delete_session_btn_{session_id}"):
                                     if st.button("Elimina seduta", key=f"del_{session_id}"):
                                         resp = call_delete_session_api(
                                             st.session_state.get("user_id", ""),
@@ -351,11 +872,43 @@ def patient_page(patient_id: str):  # noqa: C901, PLR0912, PLR0915
                                         if "error" in resp:
                                             st.error(resp["error"])
                                         else:
+                                            forget_session(
+                                                st.session_state.get("user_id", ""),
+                                                patient_id,
+                                                session_id,
+                                            )
                                             st.success("Seduta eliminata")
                                             st.rerun()
                             # Small space
                             st.markdown("<br>", unsafe_allow_html=True)
 
+                total_words = 0
+                total_duration = 0
+                for session_id, kind, result in iter_session_list_data(sessions, patient_id):
+                    if kind == "summary":
+                        with summary_slots[session_id].container():
+                            render_session_summary(result)
+                        continue
+                    with stats_slots[session_id].container():
+                        render_session_stats(result)
+                    if "version" in result:  # real stats, not the failure fallback
+                        point = TrendPoint.from_stats(
+                            sessions[session_id].get("datetime", ""), result
+                        )
+                        trends_changed |= trends.add(session_id, point)
+                    if not trends_complete:
+                        total_words += result["word_count"]
+                        total_duration += result["duration"]
+                        total_words_slot.metric("Parole totali", total_words)
+                        total_duration_slot.metric("Durata totale (s)", round(total_duration, 1))
+                if not sessions:
+                    total_words_slot.metric("Parole totali", 0)
+                    total_duration_slot.metric("Durata totale (s)", 0)
+                if trends_changed:
+                    PatientTrends.save_trends(patient_id, trends)
+                    with trend_slot.container():
+                        display_trend_chart(trends)
+
             else:
                 st.error("Paziente non trovato.")
         else:
@@ -0,0 +1,101 @@
+"""Per-patient series of session aggregates for trend charts."""
+
+import threading
+from typing import Any
+
+from pydantic import BaseModel
+
+from firebase_handler import delete_json, load_json, save_json
+from session_stats import SessionStats
+
+COLLECTION = "patient_trends"
+
+# Serialises read-modify-write of trend documents within this process
+_TRENDS_LOCK = threading.Lock()
+
+
+class TrendPoint(BaseModel):
+    """Aggregates of one session, as plotted on the patient's trend chart."""
+
+    datetime: str = ""
+    word_count: int = 0
+    duration: float = 0.0
+    # Patient's share of the session's talk time (0-1)
+    patient_share: float = 0.0
+
+    @staticmethod
+    def from_stats(session_datetime: str, stats: dict[str, Any]) -> "TrendPoint":
+        """Build a point from a ``SessionStats.model_dump()`` dictionary."""
+        summary = SessionStats(**stats)
+        return TrendPoint(
+            datetime=session_datetime,
+            word_count=summary.word_count,
+            duration=summary.duration,
+            patient_share=summary.patient_share,
+        )
+
+
+class PatientTrends(BaseModel):
+    """Per-session aggregates of a patient with running totals.
+
+    Adding, replacing or removing one session updates the totals in O(1);
+    no transcript is needed to draw the series.
+    """
+
+    points: dict[str, TrendPoint] = {}
+    total_words: int = 0
+    total_duration: float = 0.0
+
+    @staticmethod
+    def load_trends(patient_id: str) -> "PatientTrends":
+        """Load a patient's trends; empty trends if none are stored."""
+        data = load_json(COLLECTION, patient_id)
+        if data:
+            return PatientTrends(**data)
+        return PatientTrends()
+
+    @staticmethod
+    def save_trends(patient_id: str, trends: "PatientTrends") -> None:
+        """Save a patient's trends."""
+        save_json(COLLECTION, patient_id, trends.model_dump())
+
+    @staticmethod
+    def delete_trends(patient_id: str) -> bool:
+        """Delete a patient's trends."""
+        return delete_json(COLLECTION, patient_id)
+
+    @staticmethod
+    def forget(patient_id: str, session_id: str) -> None:
+        """Remove one session from a patient's stored trends."""
+        with _TRENDS_LOCK:
+            trends = PatientTrends.load_trends(patient_id)
+            if trends.remove(session_id):
+                PatientTrends.save_trends(patient_id, trends)
+
+    def add(self, session_id: str, point: TrendPoint) -> bool:
+        """Add or replace the point of ``session_id``; ``False`` if nothing changed."""
+        old = self.points.get(session_id)
+        if old == point:
+            return False
+        if old is not None:
+            self.remove(session_id)
+        self.points[session_id] = point
+        self.total_words += point.word_count
+        self.total_duration += point.duration
+        return True
+
+    def remove(self, session_id: str) -> bool:
+        """Remove the point of ``session_id``; ``False`` if it was not there."""
+        old = self.points.pop(session_id, None)
+        if old is None:
+            return False
+        self.total_words -= old.word_count
+        self.total_duration -= old.duration
+        return True
+
+    def series(self) -> list[dict[str, Any]]:
+        """Return the points in chronological order as chart rows."""
+        return [
+            {"session_id": session_id, **point.model_dump()}
+            for session_id, point in sorted(self.points.items(), key=lambda kv: kv[1].datetime)
+        ]
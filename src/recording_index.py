@@ -0,0 +1,86 @@
+"""Per-patient index of uploaded recordings by content hash."""
+
+import hashlib
+import threading
+
+from pydantic import BaseModel
+
+from firebase_handler import delete_json, load_json, save_json
+
+COLLECTION = "recording_index"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Serialises read-modify-write of index documents within this process
+_INDEX_LOCK = threading.Lock()
+# (patient_id, sha256) pairs currently being uploaded
+_IN_FLIGHT: set[tuple[str, str]] = set()
+
+
+def file_sha256(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Return the SHA-256 hex digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RecordingIndex(BaseModel):
+    """Map of recording SHA-256 digests to the transcription ids they produced."""
+
+    hashes: dict[str, str] = {}
+
+    @staticmethod
+    def load_index(patient_id: str) -> "RecordingIndex":
+        """Load a patient's index; an empty index if none is stored."""
+        data = load_json(COLLECTION, patient_id)
+        if data:
+            return RecordingIndex(**data)
+        return RecordingIndex()
+
+    @staticmethod
+    def save_index(patient_id: str, index: "RecordingIndex") -> None:
+        """Save a patient's index."""
+        save_json(COLLECTION, patient_id, index.model_dump())
+
+    @staticmethod
+    def delete_index(patient_id: str) -> bool:
+        """Delete a patient's index."""
+        return delete_json(COLLECTION, patient_id)
+
+    @staticmethod
+    def lookup(patient_id: str, digest: str) -> str | None:
+        """Return the transcription id already produced by ``digest``, if any."""
+        return RecordingIndex.load_index(patient_id).hashes.get(digest)
+
+    @staticmethod
+    def register(patient_id: str, digest: str, transcription_id: str) -> None:
+        """Record that ``digest`` produced ``transcription_id``."""
+        with _INDEX_LOCK:
+            index = RecordingIndex.load_index(patient_id)
+            index.hashes[digest] = transcription_id
+            RecordingIndex.save_index(patient_id, index)
+
+    @staticmethod
+    def forget(patient_id: str, transcription_id: str) -> None:
+        """Remove every digest pointing to ``transcription_id``."""
+        with _INDEX_LOCK:
+            index = RecordingIndex.load_index(patient_id)
+            kept = {d: t for d, t in index.hashes.items() if t != transcription_id}
+            if len(kept) != len(index.hashes):
+                RecordingIndex.save_index(patient_id, RecordingIndex(hashes=kept))
+
+    @staticmethod
+    def claim(patient_id: str, digest: str) -> bool:
+        """Mark ``digest`` as uploading; ``False`` if it already is."""
+        with _INDEX_LOCK:
+            if (patient_id, digest) in _IN_FLIGHT:
+                return False
+            _IN_FLIGHT.add((patient_id, digest))
+            return True
+
+    @staticmethod
+    def release(patient_id: str, digest: str) -> None:
+        """Clear the uploading mark set by :meth:`claim`."""
+        with _INDEX_LOCK:
+            _IN_FLIGHT.discard((patient_id, digest))
@@ -0,0 +1,139 @@
+"""Memory-bounded LRU cache with TTLs for backend responses."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+CacheKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+def make_key(namespace: str, path: str, params: dict[str, Any] | None = None) -> CacheKey:
+    """Return the cache key for ``path`` called with ``params`` by ``namespace``."""
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (namespace, path, items)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """Thread-safe LRU cache bounded by the total size of its values in bytes.
+
+    Entries are namespaced (one namespace per user) and expire after a TTL.
+    Expired entries are no longer served by :meth:`get` but stay available to
+    :meth:`get_stale` for conditional revalidation until they are evicted.
+    When inserting would exceed ``max_bytes``, least recently used entries are
+    evicted first. Values larger than ``max_bytes`` are not cached at all.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.revalidations = 0
+
+    def get(self, key: CacheKey) -> Any | None:
+        """Return the cached value for ``key`` or ``None`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= monotonic():
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def get_stale(self, key: CacheKey) -> Any | None:
+        """Return the value for ``key`` even if expired, without touching counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def refresh(self, key: CacheKey, ttl: float | None = None) -> bool:
+        """Mark ``key`` as revalidated, restarting its TTL. Returns ``False`` if absent."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.expires_at = monotonic() + (self.default_ttl if ttl is None else ttl)
+            self._entries.move_to_end(key)
+            self.revalidations += 1
+            return True
+
+    def put(self, key: CacheKey, value: Any, size: int, ttl: float | None = None) -> None:
+        """Store ``value`` accounting for ``size`` bytes, evicting LRU entries as needed."""
+        if size > self.max_bytes:
+            return
+        expires_at = monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = _Entry(value, size, expires_at)
+            self._bytes += size
+
+    def invalidate(self, namespace: str, path: str | None = None, **params: Any) -> int:
+        """Drop entries in ``namespace`` matching ``path`` and all ``params``.
+
+        Returns the number of entries removed.
+        """
+        wanted = {(str(k), str(v)) for k, v in params.items()}
+        with self._lock:
+            doomed = [
+                key
+                for key in self._entries
+                if key[0] == namespace
+                and (path is None or key[1] == path)
+                and wanted.issubset(key[2])
+            ]
+            for key in doomed:
+                self._remove(key)
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def clear(self) -> None:
+        """Remove every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "revalidations": self.revalidations,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
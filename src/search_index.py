@@ -0,0 +1,287 @@
+"""Full-text search over a therapist's session transcripts and summaries."""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from firebase_handler import delete_json, load_json, save_json
+from sentence_index import sentence_index
+from session_loader import fan_out
+from transcript import Transcript
+
+COLLECTION = "search_index"
+# Occurrence timestamps kept per term and session; further hits only add to the score
+MAX_POSITIONS = 20
+# Timestamp of hits in text without a position, such as framework summaries
+NO_TIME = -1.0
+SOURCES = ("transcript", "episodic", "framework")
+
+STOPWORDS = frozenset(
+    {
+        "il", "lo", "la", "le", "gli", "un", "una", "uno", "di", "da", "in", "con",
+        "su", "per", "tra", "fra", "del", "della", "dei", "delle", "al", "alla",
+        "ai", "alle", "nel", "nella", "che", "non", "si", "mi", "ti", "ci", "vi",
+        "ne", "ed", "ma", "se", "io", "tu", "lui", "lei", "noi", "voi", "loro",
+        "sono", "sei", "ho", "hai", "ha", "era", "come", "anche", "poi", "quindi",
+        "the", "and", "of", "to", "is", "it", "that", "in", "on", "for", "with",
+    }
+)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the searchable terms of ``text``: lower-cased, accent-folded words."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return [t for t in _TOKEN_RE.findall(folded) if len(t) > 1 and t not in STOPWORDS]
+
+
+class SessionTerms(BaseModel):
+    """Stored search terms of one session, with the times they occur at."""
+
+    patient_id: str = ""
+    sources: list[str] = []
+    # term -> [count, time, time, ...]; times are seconds or ``NO_TIME``
+    terms: dict[str, list[float]] = {}
+
+    @staticmethod
+    def load_terms(transcription_id: str) -> SessionTerms | None:
+        """Load the stored terms of a transcription."""
+        data = load_json(COLLECTION, transcription_id)
+        if data:
+            return SessionTerms(**data)
+        return None
+
+    @staticmethod
+    def save_terms(transcription_id: str, terms: SessionTerms) -> None:
+        """Save the terms of a transcription."""
+        save_json(COLLECTION, transcription_id, terms.model_dump())
+
+    @staticmethod
+    def delete_terms(transcription_id: str) -> bool:
+        """Delete the stored terms of a transcription."""
+        return delete_json(COLLECTION, transcription_id)
+
+    def add(self, source: str, texts: list[tuple[str, float]]) -> None:
+        """Add ``(text, time)`` pairs found in ``source``."""
+        for text, time in texts:
+            for term in tokenize(text):
+                entry = self.terms.setdefault(term, [0.0])
+                entry[0] += 1
+                if len(entry) <= MAX_POSITIONS:
+                    entry.append(time)
+        if source not in self.sources:
+            self.sources.append(source)
+
+
+@dataclass
+class SearchHit:
+    """One session matching a query."""
+
+    session_id: str
+    patient_id: str
+    score: float
+    # Sorted occurrence times in seconds; empty if the match has no position
+    times: list[float]
+
+
+class SearchIndex:
+    """In-memory inverted index over the sessions of one user.
+
+    Sessions are merged in one at a time as their terms are loaded or
+    computed, so the index grows as sessions are fetched.
+    """
+
+    def __init__(self) -> None:
+        # Guards the in-memory structures only; never held across storage calls
+        self.lock = threading.RLock()
+        self.sessions: dict[str, SessionTerms] = {}
+        # term -> session_id -> [count, time, ...]
+        self.postings: dict[str, dict[str, list[float]]] = {}
+        # Sessions already looked up in storage, found or not
+        self.checked: set[str] = set()
+        self._sorted_terms: list[str] | None = None
+        # Serialise read-modify-write of one session's stored terms
+        self._session_locks: dict[str, threading.Lock] = {}
+
+    def session_lock(self, session_id: str) -> threading.Lock:
+        """Return the lock serialising updates of ``session_id``'s stored terms."""
+        with self.lock:
+            return self._session_locks.setdefault(session_id, threading.Lock())
+
+    def add(self, session_id: str, terms: SessionTerms) -> None:
+        """Merge (or replace) the terms of ``session_id``."""
+        with self.lock:
+            self.remove(session_id)
+            self.sessions[session_id] = terms
+            for term, entry in terms.terms.items():
+                self.postings.setdefault(term, {})[session_id] = entry
+            self._sorted_terms = None
+
+    def remove(self, session_id: str) -> None:
+        """Drop ``session_id`` from the index."""
+        with self.lock:
+            old = self.sessions.pop(session_id, None)
+            if old is None:
+                return
+            for term in old.terms:
+                sessions = self.postings.get(term)
+                if sessions is not None:
+                    sessions.pop(session_id, None)
+                    if not sessions:
+                        del self.postings[term]
+            self._sorted_terms = None
+
+    def expand(self, prefix: str) -> list[str]:
+        """Return the indexed terms starting with ``prefix``."""
+        with self.lock:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self.postings)
+            terms = self._sorted_terms
+        matches = []
+        for term in terms[bisect_left(terms, prefix):]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, patient_id: str | None = None, limit: int = 20) -> list[SearchHit]:
+        """Return sessions containing every query term, best match first.
+
+        The last query term also matches as a prefix, so results appear
+        while a word is still being typed.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self.lock:
+            per_word = []
+            for n, word in enumerate(words):
+                candidates = self.expand(word) if n == len(words) - 1 else [word]
+                merged: dict[str, list[float]] = {}
+                for term in candidates:
+                    for session_id, entry in self.postings.get(term, {}).items():
+                        hit = merged.setdefault(session_id, [0.0])
+                        hit[0] += entry[0]
+                        hit.extend(entry[1:])
+                per_word.append(merged)
+            matching = set.intersection(*(set(m) for m in per_word))
+            hits = []
+            for session_id in matching:
+                owner = self.sessions[session_id].patient_id
+                if patient_id is not None and owner != patient_id:
+                    continue
+                score = sum(m[session_id][0] for m in per_word)
+                times = {t for m in per_word for t in m[session_id][1:] if t != NO_TIME}
+                hits.append(SearchHit(session_id, owner, score, sorted(times)))
+        hits.sort(key=lambda h: h.score, reverse=True)
+        return hits[:limit]
+
+
+_INDEXES: dict[str, SearchIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def user_index(user_id: str) -> SearchIndex:
+    """Return the process-wide search index of ``user_id``."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(user_id)
+        if index is None:
+            index = _INDEXES[user_id] = SearchIndex()
+        return index
+
+
+def load_sessions(user_id: str, session_ids) -> None:
+    """Merge the stored terms of ``session_ids`` not yet looked up into the user's index."""
+    index = user_index(user_id)
+    with index.lock:
+        missing = [sid for sid in session_ids if sid not in index.checked]
+        index.checked.update(missing)
+    for session_id, terms in fan_out(SessionTerms.load_terms, missing):
+        if isinstance(terms, SessionTerms):
+            with index.lock:
+                # Terms indexed meanwhile already include the stored ones
+                if session_id not in index.sessions:
+                    index.add(session_id, terms)
+
+
+def _index_source(
+    user_id: str,
+    session_id: str,
+    patient_id: str,
+    source: str,
+    texts: list[tuple[str, float]],
+) -> None:
+    index = user_index(user_id)
+    # Storage is read and written under the session's own lock, so sessions
+    # are indexed in parallel and the user's index lock is held only briefly
+    with index.session_lock(session_id):
+        with index.lock:
+            current = index.sessions.get(session_id)
+            index.checked.add(session_id)
+        if current is None:
+            # Also when already checked: a concurrent load_sessions may not
+            # have merged the stored terms yet, and they must not be overwritten
+            current = SessionTerms.load_terms(session_id)
+            if current is not None:
+                index.add(session_id, current)
+        if current is not None and source in current.sources:
+            return
+        terms = current.model_copy(deep=True) if current is not None else SessionTerms()
+        terms.patient_id = terms.patient_id or patient_id
+        terms.add(source, texts)
+        SessionTerms.save_terms(session_id, terms)
+        index.add(session_id, terms)
+
+
+def index_transcript(user_id: str, session_id: str, patient_id: str, transcript: Transcript) -> None:
+    """Index a session's transcript, one entry per sentence at its start time."""
+    if is_indexed(user_id, session_id, "transcript"):
+        return
+    sentences = sentence_index(transcript)
+    texts = [(sentences.sentence(k), float(sentences.start[k])) for k in range(len(sentences))]
+    _index_source(user_id, session_id, patient_id, "transcript", texts)
+
+
+def index_episodic_summary(user_id: str, session_id: str, patient_id: str, epi_summary: dict) -> None:
+    """Index the episodic summaries of a session, each at its start time."""
+    summaries = (epi_summary or {}).get("summary_list", [])
+    texts = []
+    start = 0.0
+    for epi in sorted(summaries, key=lambda e: float(e.get("end_position", "0"))):
+        texts.append((epi.get("summary", ""), start))
+        start = float(epi.get("end_position", "0"))
+    if texts:
+        _index_source(user_id, session_id, patient_id, "episodic", texts)
+
+
+def index_framework_summary(user_id: str, session_id: str, patient_id: str, summary: dict) -> None:
+    """Index the framework summary of a session."""
+    text = summary.get("summary") if "error" not in summary else None
+    if text:
+        _index_source(user_id, session_id, patient_id, "framework", [(text, NO_TIME)])
+
+
+def is_indexed(user_id: str, session_id: str, source: str) -> bool:
+    """Return whether ``source`` of ``session_id`` is already in the user's index."""
+    index = user_index(user_id)
+    with index.lock:
+        terms = index.sessions.get(session_id)
+        return terms is not None and source in terms.sources
+
+
+def forget_session(user_id: str, session_id: str) -> None:
+    """Remove a session from the user's index and from storage."""
+    user_index(user_id).remove(session_id)
+    SessionTerms.delete_terms(session_id)
+
+
+def search(user_id: str, query: str, patient_id: str | None = None, limit: int = 20) -> list[SearchHit]:
+    """Search the sessions of ``user_id`` (optionally one patient's) for ``query``."""
+    return user_index(user_id).search(query, patient_id=patient_id, limit=limit)
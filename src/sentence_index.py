@@ -0,0 +1,97 @@
+"""Sentence boundaries of a transcript mapped to word indices and timestamps."""
+
+from __future__ import annotations
+
+import string
+
+import numpy as np
+
+from transcript import Transcript, forward_filled
+
+SENTENCE_END = frozenset(".?!…")
+# Closing characters allowed after the terminal punctuation, e.g. ``bene."``
+CLOSING = "\"'”’»)]"
+# Lower-cased words ending with a full stop that do not end a sentence
+ABBREVIATIONS = frozenset(
+    {
+        # Italian
+        "dott.", "dott.ssa", "dr.", "sig.", "sig.ra", "sigg.", "prof.", "prof.ssa",
+        "ing.", "avv.", "arch.", "geom.", "rag.", "egr.", "gent.", "on.", "sen.",
+        "ecc.", "es.", "p.es.", "cfr.", "vs.", "pag.", "pagg.", "cap.", "art.",
+        "n.", "nr.", "num.", "tel.", "fig.", "vol.", "ca.", "c.a.", "s.p.a.",
+        "a.c.", "d.c.", "sec.", "min.",
+        # English
+        "mr.", "mrs.", "ms.", "st.", "e.g.", "i.e.", "etc.", "approx.",
+    }
+)
+
+
+def is_sentence_end(word: str) -> bool:
+    """Return whether ``word`` closes a sentence.
+
+    ``.``, ``?``, ``!`` and ``…`` end a sentence, optionally followed by
+    closing quotes or brackets; a full stop does not when the word is a
+    known abbreviation or an upper-case initial such as ``A.``. Short
+    lower-case words such as ``è.`` or ``a.`` still end a sentence.
+    """
+    token = word.rstrip(CLOSING)
+    if not token or token[-1] not in SENTENCE_END:
+        return False
+    if token.endswith("..") or token[-1] != ".":
+        return True
+    token = token.lstrip("\"'“‘«([")
+    if token.lower() in ABBREVIATIONS:
+        return False
+    return not (len(token) == 2 and token[0] in string.ascii_uppercase)
+
+
+class SentenceIndex:
+    """Sentences of a :class:`Transcript` as parallel arrays.
+
+    Sentence ``k`` covers words ``first_word[k]`` to ``end_word[k] - 1``;
+    ``start`` holds its start time with missing timestamps carried forward,
+    so it is sorted and any time lookup is a binary search.
+    """
+
+    __slots__ = ("transcript", "first_word", "end_word", "start")
+
+    def __init__(self, transcript: Transcript) -> None:
+        self.transcript = transcript
+        n = len(transcript)
+        ends = [i + 1 for i in range(n) if is_sentence_end(transcript.word(i))]
+        if n and (not ends or ends[-1] != n):
+            ends.append(n)
+        self.end_word = np.asarray(ends, dtype=np.int64)
+        self.first_word = np.zeros(len(ends), dtype=np.int64)
+        self.first_word[1:] = self.end_word[:-1]
+        self.start = forward_filled(transcript.start[self.first_word])
+
+    def __len__(self) -> int:
+        return len(self.end_word)
+
+    def sentence(self, k: int) -> str:
+        """Return the text of sentence ``k``."""
+        return self.transcript.join(int(self.first_word[k]), int(self.end_word[k])).strip()
+
+    def sentences(self, start: int, stop: int) -> list[str]:
+        """Return the text of sentences ``start`` to ``stop - 1``."""
+        return [self.sentence(k) for k in range(max(start, 0), min(stop, len(self)))]
+
+    def at_time(self, seconds: float) -> int:
+        """Return the first sentence starting at or after ``seconds`` (clamped to the last)."""
+        return min(int(np.searchsorted(self.start, seconds, side="left")), max(len(self) - 1, 0))
+
+    def of_word(self, i: int) -> int:
+        """Return the sentence containing word ``i``."""
+        return int(np.searchsorted(self.end_word, i, side="right"))
+
+    def word_range(self, start: int, stop: int) -> tuple[int, int]:
+        """Return the ``[first, end)`` word range spanned by sentences ``start`` to ``stop - 1``."""
+        if stop <= start:
+            return 0, 0
+        return int(self.first_word[start]), int(self.end_word[stop - 1])
+
+
+def sentence_index(transcript: Transcript) -> SentenceIndex:
+    """Return the sentence index of ``transcript``, built once and memoised on it."""
+    return transcript.derived("sentence_index", SentenceIndex)
@@ -0,0 +1,67 @@
+"""Bounded-concurrency loading of per-session data for the Streamlit pages."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# Upper bound on concurrent backend calls issued by a single page render.
+MAX_WORKERS = int(os.getenv("SESSION_LOADER_WORKERS", "8"))
+
+
+def fan_out(
+    func: Callable[[K], Any],
+    keys: Iterable[K],
+    *,
+    max_workers: int = MAX_WORKERS,
+) -> Iterator[tuple[K, Any]]:
+    """Call ``func`` for every key on a thread pool, yielding results as they finish.
+
+    Parameters
+    ----------
+    func:
+        Callable applied to each key. It runs in a worker thread, so it must
+        not touch ``st.session_state``; pass anything it needs explicitly.
+    keys:
+        Keys to load. Duplicates are loaded once.
+    max_workers:
+        Maximum number of calls in flight at the same time.
+
+    Yields
+    ------
+    tuple
+        ``(key, result)`` pairs in completion order. A call that raises yields
+        ``{"error": str(exc)}`` so one failing session does not break the page.
+    """
+    unique = list(dict.fromkeys(keys))
+    if not unique:
+        return
+    workers = max(1, min(max_workers, len(unique)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-loader")
+    try:
+        futures = {pool.submit(func, key): key for key in unique}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # degrade to the API helpers' error shape
+                result = {"error": str(e)}
+            yield key, result
+    finally:
+        # A consumer that stops early (e.g. a Streamlit rerun) must not wait
+        # for the calls still queued
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def load_all(
+    func: Callable[[K], Any],
+    keys: Iterable[K],
+    *,
+    max_workers: int = MAX_WORKERS,
+) -> dict[K, Any]:
+    """Return ``{key: func(key)}`` computed concurrently; see :func:`fan_out`."""
+    return dict(fan_out(func, keys, max_workers=max_workers))
@@ -1,22 +1,48 @@
 """Session streamlit page."""
 
+import html
 import json
+import os
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
 from typing import Any
 
+import numpy as np
 import requests
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
 
-from api_client import auth_headers, backend_url
+import api_client
+import search_index
 from login import call_get_user_api
-from markdown_loader import load_markdown
-from styles import (
-    CARD_STYLE,
-    DISCLAIMER_STYLE,
-    WHITE_BUTTON_STYLE,
-    DELETE_SESSION_BUTTON_STYLE,
+from markdown_loader import load_markdown, load_template
+from patient_trends import PatientTrends
+from recording_index import RecordingIndex
+from response_cache import ResponseCache, make_key
+from sentence_index import sentence_index
+from session_stats import SessionStats
+from theme import inject_theme, themed
+from transcript import Transcript, as_transcript, forward_filled, speaker_role
+
+# Parsed transcripts kept in memory between reruns, bounded by their size
+TRANSCRIPT_CACHE = ResponseCache(
+    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    default_ttl=api_client.TRANSCRIPT_CACHE_TTL,
 )
 
+# Activity chart bin sizes in seconds, all computed together from one pass
+ACTIVITY_RESOLUTIONS = {10: "10 s", 30: "30 s", 60: "1 min", 300: "5 min"}
+DEFAULT_ACTIVITY_RESOLUTION = 60
+# Most points drawn on the activity chart; longer series are downsampled
+ACTIVITY_CHART_POINTS = int(os.getenv("ACTIVITY_CHART_POINTS", "500"))
+
+# Whether related conversations are drawn as one HTML block per summary by default
+CHAT_SINGLE_BLOCK_DEFAULT = os.getenv("CHAT_SINGLE_BLOCK", "true").lower() in {"1", "true", "yes"}
+CHAT_AVATARS = {"assistant": "🧑‍⚕️", "user": "👤"}
+
+# Rows sent to the browser per page of a long conversation or transcript
+WINDOW_PAGE_SIZES = (25, 50, 100, 200)
+DEFAULT_WINDOW_PAGE_SIZE = 50
+
 
 # Placeholder function for changing the speaker
 def change_speaker_callback(group_index):
@@ -24,17 +50,44 @@ def change_speaker_callback(group_index):
     st.info(f"Cambia parlante per il gruppo {group_index} (funzione segnaposto)")
 
 
+def drop_cached_session(user_id: str, session_id: str) -> None:
+    """Drop the cached responses and parsed transcript of a deleted session."""
+    api_client.invalidate_cached(user_id, transcription_id=session_id)
+    TRANSCRIPT_CACHE.invalidate(user_id, transcription_id=session_id)
+
+
+def _forget_session_data(user_id: str, session_id: str) -> None:
+    """Remove the caches, stats and search terms of a deleted session."""
+    drop_cached_session(user_id, session_id)
+    SessionStats.delete_stats(session_id)
+    search_index.forget_session(user_id, session_id)
+
+
+def forget_session(user_id: str, patient_id: str, session_id: str) -> None:
+    """Remove everything stored or cached locally for a deleted session."""
+    _forget_session_data(user_id, session_id)
+    RecordingIndex.forget(patient_id, session_id)
+    PatientTrends.forget(patient_id, session_id)
+
+
+def forget_patient(user_id: str, patient_id: str, session_ids: list[str]) -> None:
+    """Remove everything stored or cached locally for a deleted patient and its sessions."""
+    for session_id in session_ids:
+        _forget_session_data(user_id, session_id)
+    RecordingIndex.delete_index(patient_id)
+    PatientTrends.delete_trends(patient_id)
+
+
 def call_delete_session_api(user_id: str, patient_id: str, session_id: str) -> dict:
     """Call API to delete a session."""
     try:
-        resp = requests.delete(
-            f"{backend_url()}/delete_session",
+        resp = api_client.delete(
+            "/delete_session",
             params={
                 "user_id": user_id,
                 "patient_id": patient_id,
                 "session_id": session_id,
             },
-            headers=auth_headers(),
         )
         resp.raise_for_status()
         return resp.json()
@@ -42,45 +95,107 @@ def call_delete_session_api(user_id: str, patient_id: str, session_id: str) -> d
         return {"error": str(e)}
 
 
+def compute_activity_bins(words, intervals=ACTIVITY_RESOLUTIONS) -> dict[int, np.ndarray]:
+    """Return word counts per time bin for several bin sizes from one pass.
+
+    Start times are counted once with ``numpy.bincount`` at the greatest
+    common divisor of ``intervals``; every coarser resolution is then the sum
+    of consecutive fine bins, so no interval re-reads the words.
+
+    Parameters
+    ----------
+    words:
+        A :class:`Transcript` (or list of word dictionaries) with ``start``
+        timestamps.
+    intervals:
+        Bin sizes in whole seconds.
+
+    Returns
+    -------
+    dict
+        Maps each interval to an ``int64`` array of counts, bin ``i``
+        covering ``[i * interval, (i + 1) * interval)``.
+    """
+    transcript = as_transcript(words)
+    intervals = [int(i) for i in intervals]
+    starts = transcript.start[~np.isnan(transcript.start)]
+    if not len(starts) or not intervals:
+        return {interval: np.zeros(0, dtype=np.int64) for interval in intervals}
+    base = int(np.gcd.reduce(intervals))
+    fine = np.bincount((np.maximum(starts, 0) // base).astype(np.int64))
+    bins = {}
+    for interval in intervals:
+        factor = interval // base
+        padded = np.pad(fine, (0, -len(fine) % factor))
+        bins[interval] = padded.reshape(-1, factor).sum(axis=1)
+    return bins
+
+
 def compute_activity_data(words, interval=60):
     """Return word-count data binned by time interval.
 
     Parameters
     ----------
     words:
-        List of word dictionaries containing ``start`` timestamps.
+        A :class:`Transcript` (or list of word dictionaries) with ``start``
+        timestamps.
     interval:
         Size of each time bin in seconds. Defaults to 60 seconds.
     """
-    if not words:
-        return []
-    starts = [w.get("start") for w in words if w.get("start") is not None]
-    if not starts:
-        return []
-    last_time = max(starts)
-    bins = int(last_time // interval) + 1
-    counts = [0] * bins
-    for start in starts:
-        idx = int(start // interval)
-        counts[idx] += 1
-    data = [{"time": i * interval, "words": counts[i]} for i in range(bins)]
-    return data
+    transcript = as_transcript(words)
+    if interval in ACTIVITY_RESOLUTIONS:
+        # All resolutions are binned together and kept with the transcript
+        counts = transcript.derived("activity_bins", compute_activity_bins)[interval]
+    else:
+        counts = compute_activity_bins(transcript, [interval])[interval]
+    return [{"time": i * interval, "words": int(c)} for i, c in enumerate(counts)]
 
 
-def display_activity_chart(transcript):
-    """Display a simple activity chart and basic session analytics."""
-    words = transcript.get("data", {}).get("words", [])
-    data = compute_activity_data(words)
-    if not data:
-        st.write("Nessun dato di attività disponibile.")
-        return
-    total_words = len(words)
-    total_duration = max((w.get("end", 0) for w in words), default=0)
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Return the indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into ``threshold - 2`` buckets; from each bucket the point forming
+    the largest triangle with the previously kept point and the average of the
+    next bucket is kept, which preserves peaks and the overall shape.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_x = x[hi:edges[b + 2]].mean()
+            next_y = y[hi:edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        px, py = x[previous], y[previous]
+        areas = np.abs(
+            (px - next_x) * (y[lo:hi] - py) - (px - x[lo:hi]) * (next_y - py)
+        )
+        previous = lo + int(np.argmax(areas))
+        keep[b + 1] = previous
+    return keep
+
+
+def activity_chart_spec(transcript: Transcript, interval: int) -> dict | None:
+    """Return the Vega-Lite spec of the activity chart at ``interval`` resolution.
+
+    Series longer than ``ACTIVITY_CHART_POINTS`` are downsampled with
+    :func:`lttb`. Returns ``None`` if Altair is not installed.
+    """
     try:  # Import locally to avoid hard dependency during tests
         import altair as alt
     except ModuleNotFoundError:  # pragma: no cover - chart is optional
-        st.write("Altair è necessario per visualizzare il grafico dell'attività.")
-        return
+        return None
+    counts = transcript.derived("activity_bins", compute_activity_bins)[interval]
+    times = np.arange(len(counts), dtype=np.float64) * interval
+    keep = lttb(times, counts.astype(np.float64), ACTIVITY_CHART_POINTS)
+    data = [{"time": int(times[i]), "words": int(counts[i])} for i in keep]
     chart = (
         alt.Chart(alt.Data(values=data))
         .mark_area(
@@ -97,130 +212,417 @@ def display_activity_chart(transcript):
         .configure_view(strokeWidth=0)
         .configure(background="#ffffff")
     )
+    return chart.to_dict()
+
+
+def display_activity_chart(transcript):
+    """Display a simple activity chart and basic session analytics."""
+    transcript = as_transcript(transcript)
+    if not len(transcript):
+        st.write("Nessun dato di attività disponibile.")
+        return
+    interval = st.radio(
+        "Risoluzione",
+        options=list(ACTIVITY_RESOLUTIONS),
+        index=list(ACTIVITY_RESOLUTIONS).index(DEFAULT_ACTIVITY_RESOLUTION),
+        format_func=ACTIVITY_RESOLUTIONS.get,
+        horizontal=True,
+        key="activity_resolution",
+    )
+    if interval not in ACTIVITY_RESOLUTIONS or not len(
+        transcript.derived("activity_bins", compute_activity_bins)[interval]
+    ):
+        st.write("Nessun dato di attività disponibile.")
+        return
+    stats = transcript.derived("session_stats", SessionStats.from_transcript)
+    # The finished spec is kept with the transcript, one per resolution
+    spec = transcript.derived(
+        f"activity_chart_{interval}", lambda t: activity_chart_spec(t, interval)
+    )
+    if spec is None:
+        st.write("Altair è necessario per visualizzare il grafico dell'attività.")
+        return
     st.markdown("<div></div>", unsafe_allow_html=True)  # ensure CSS scope is active
     st.subheader("Attività della seduta")
-    col1, col2 = st.columns(2)
-    col1.metric("Parole", total_words)
-    col2.metric("Durata (s)", round(total_duration, 1))
-    st.altair_chart(chart, use_container_width=True)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Parole", stats.word_count)
+    col2.metric("Durata (s)", round(stats.duration, 1))
+    col3.metric("Parole/min", round(stats.words_per_minute, 1))
+    col4.metric("Turni", stats.turn_count)
+    st.vega_lite_chart(spec, use_container_width=True)
+    display_speaker_stats(stats)
+
+
+def display_speaker_stats(stats: SessionStats) -> None:
+    """Display per-speaker talk metrics and silences of a session."""
+    if not stats.speakers:
+        return
+    shares = stats.speaker_shares
+    rows = [
+        {
+            "Parlante": speaker,
+            "Ruolo": "Terapeuta" if s.role == "assistant" else "Paziente",
+            "Parole": s.word_count,
+            "Tempo di parola (s)": round(s.talk_time, 1),
+            "Quota": f"{shares[speaker]:.0%}" if stats.talk_time else "–",
+            "Turni": s.turns,
+            "Parole per turno": round(s.mean_turn_words, 1),
+            "Durata media turno (s)": round(s.mean_turn_duration, 1),
+        }
+        for speaker, s in stats.speakers.items()
+    ]
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Silenzi", stats.silence_count)
+    col2.metric("Silenzio totale (s)", round(stats.silence_total, 1))
+    col3.metric("Silenzio più lungo (s)", round(stats.longest_silence, 1))
+
+
+def speaker_roles(transcript: Transcript) -> list[str]:
+    """Return the chat role of each of ``transcript.speakers``, by speaker code."""
+    return [speaker_role(speaker) for speaker in transcript.speakers]
+
+
+def _make_group(speaker, role, text, start, end, first_word, end_word) -> dict:
+    return {
+        "speaker": speaker,
+        "role": role,
+        "text": text,
+        "start_time": start,
+        "end_time": end,
+        "first_word": first_word,
+        "end_word": end_word,
+    }
 
 
 # Helper function to group messages by speaker
 def group_messages_by_speaker(words):
-    """Return a list of dicts."""
-    if not words:
+    """Return a list of dicts, one per run of consecutive words by the same speaker.
+
+    ``words`` is a :class:`Transcript` (or list of word dictionaries). Run
+    boundaries are found in one vectorised pass over the speaker codes, each
+    group's text is a single slice of the transcript's text buffer and roles
+    are resolved once per distinct speaker. Groups also carry the word index
+    range ``[first_word, end_word)`` they cover.
+    """
+    transcript = as_transcript(words)
+    n = len(transcript)
+    if not n:
         return []
+    codes = transcript.speaker_codes
+    roles = transcript.derived("speaker_roles", speaker_roles)
+    run_starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    run_ends = np.append(run_starts[1:], n)
     groups = []
-    current_speaker = words[0].get("speaker_id", "unknown")
-    current_text = words[0]["word"]
-    group_start = words[0].get("start")
-    group_end = words[0].get("end")
-    for w in words[1:]:
-        speaker = w.get("speaker_id", "unknown")
-        word_text = w["word"]
-        word_start = w.get("start")
-        word_end = w.get("end")
-        if speaker == current_speaker:
-            current_text += " " + word_text
-            # Update group_end to the current word's end time
-            group_end = word_end
-        else:
-            groups.append(
-                {
-                    "speaker": current_speaker,
-                    "text": current_text.strip(),
-                    "start_time": group_start,
-                    "end_time": group_end,
-                }
+    for i, j in zip(run_starts.tolist(), run_ends.tolist(), strict=True):
+        start = transcript.start[i]
+        end = transcript.end[j - 1]
+        groups.append(
+            _make_group(
+                transcript.speaker(i),
+                roles[codes[i]],
+                transcript.join(i, j).strip(),
+                None if np.isnan(start) else float(start),
+                None if np.isnan(end) else float(end),
+                i,
+                j,
             )
-            current_speaker = speaker
-            current_text = word_text
-            group_start = word_start
-            group_end = word_end
-    # Append the last group
-    groups.append(
-        {
-            "speaker": current_speaker,
-            "text": current_text.strip(),
-            "start_time": group_start,
-            "end_time": group_end,
-        }
-    )
+        )
     return groups
 
 
+class SpeakerGrouper:
+    """Incremental counterpart of :func:`group_messages_by_speaker` for word streams.
+
+    Feed words as they arrive; a group is emitted as soon as the speaker
+    changes, and :meth:`flush` emits the run still open at the end of the
+    stream. Each run's text is joined once, when it closes.
+    """
+
+    def __init__(self) -> None:
+        self._roles: dict[str, str] = {}
+        self._speaker: str | None = None
+        self._tokens: list[str] = []
+        self._start: float | None = None
+        self._end: float | None = None
+        self._first_word = 0
+        self._count = 0
+
+    def feed(self, words) -> list[dict]:
+        """Consume ``words`` (word dictionaries) and return the groups they completed."""
+        done = []
+        for w in words:
+            speaker = w.get("speaker_id", "unknown")
+            if speaker != self._speaker and self._tokens:
+                done.append(self._close())
+            if not self._tokens:
+                self._speaker = speaker
+                self._start = w.get("start")
+                self._first_word = self._count
+            self._tokens.append(w.get("word", ""))
+            self._end = w.get("end")
+            self._count += 1
+        return done
+
+    def flush(self) -> list[dict]:
+        """Return the group still open, if any, and reset the current run."""
+        return [self._close()] if self._tokens else []
+
+    def _close(self) -> dict:
+        role = self._roles.get(self._speaker)
+        if role is None:
+            role = self._roles[self._speaker] = speaker_role(self._speaker)
+        group = _make_group(
+            self._speaker,
+            role,
+            " ".join(self._tokens).strip(),
+            self._start,
+            self._end,
+            self._first_word,
+            self._count,
+        )
+        self._tokens = []
+        return group
+
+
+def group_end_index(groups: list[dict]) -> tuple[list[float], list[int]]:
+    """Return group end times in ascending order and the group index of each.
+
+    A group without an end time takes the end of the group before it, so it
+    stays with the summary of the surrounding conversation.
+    """
+    ends = []
+    last = 0.0
+    for group in groups:
+        end = group.get("end_time")
+        if end is not None:
+            last = end
+        ends.append(last)
+    order = sorted(range(len(groups)), key=ends.__getitem__)
+    return [ends[i] for i in order], order
+
+
+class SummaryAlignment:
+    """Map each episodic summary to the conversation groups it covers.
+
+    Summary ``k`` covers the groups ending after the previous summary
+    boundary and no later than its own ``end_position``. Group end times and
+    summary boundaries are kept sorted, so the groups of any single summary
+    are found with two binary searches regardless of input order.
+    """
+
+    def __init__(self, groups: list[dict], summaries: list[dict], end_index=None) -> None:
+        self.groups = groups
+        self.ends, self.order = end_index or group_end_index(groups)
+        self.summary_ends = [float(epi.get("end_position", "0")) for epi in summaries]
+        # Summaries sorted by (end, index): of several sharing an end, the
+        # first one gets the groups and the others an empty range
+        order = sorted(range(len(summaries)), key=lambda k: (self.summary_ends[k], k))
+        self._bounds = [self.summary_ends[k] for k in order]
+        self._rank = {k: rank for rank, k in enumerate(order)}
+
+    def __len__(self) -> int:
+        return len(self.summary_ends)
+
+    def group_indices(self, idx: int) -> list[int]:
+        """Return the indices, in conversation order, of the groups of summary ``idx``."""
+        rank = self._rank[idx]
+        hi = bisect_right(self.ends, self._bounds[rank])
+        lo = bisect_right(self.ends, self._bounds[rank - 1]) if rank else 0
+        return sorted(self.order[lo:hi])
+
+    def groups_for(self, idx: int) -> list[dict]:
+        """Return the groups of summary ``idx`` in conversation order."""
+        return [self.groups[i] for i in self.group_indices(idx)]
+
+
+def render_chat_groups(groups: list[dict]) -> None:
+    """Render conversation groups as chat bubbles."""
+    for group in groups:
+        role = group["role"]
+        with st.chat_message(role, avatar=CHAT_AVATARS[role]):
+            # Optionally show who is speaking if speaker ids are meaningful
+            # st.caption(group.get("speaker", ""))
+            st.write(group.get("text", ""))
+
+
+def render_window(
+    key: str,
+    times: np.ndarray,
+    render_slice: Callable[[int, int], None],
+) -> None:
+    """Render only a window of a long list of rows, with paging and jump-to-time.
+
+    Parameters
+    ----------
+    key:
+        Prefix for the widget and session-state keys of this viewer. The
+        position is kept in session state across pages, so include anything
+        identifying the content (e.g. the session id).
+    times:
+        Sorted start time in seconds of every row (see :func:`forward_filled`).
+    render_slice:
+        Called with ``(start, stop)`` to draw rows ``start`` to ``stop - 1``;
+        nothing outside the window is sent to the browser.
+    """
+    total = len(times)
+    if not total:
+        return
+    start_key, count_key = f"{key}_start", f"{key}_count"
+
+    size_col, jump_col, go_col = st.columns([2, 2, 1], vertical_alignment="bottom")
+    page_size = size_col.selectbox(
+        "Righe per pagina",
+        WINDOW_PAGE_SIZES,
+        index=WINDOW_PAGE_SIZES.index(DEFAULT_WINDOW_PAGE_SIZE),
+        key=f"{key}_page_size",
+    )
+    minute = jump_col.number_input(
+        "Vai al minuto",
+        min_value=0,
+        max_value=int(times[-1] // 60),
+        step=1,
+        key=f"{key}_jump",
+    )
+    if go_col.button("Vai", key=f"{key}_go"):
+        st.session_state[start_key] = min(bisect_left(times, minute * 60), total - 1)
+        st.session_state[count_key] = page_size
+
+    start = min(st.session_state.get(start_key, 0), total - 1)
+    count = max(st.session_state.get(count_key, page_size), page_size)
+    stop = min(start + count, total)
+
+    if start > 0 and st.button("Mostra precedenti", key=f"{key}_previous"):
+        st.session_state[start_key] = max(start - page_size, 0)
+        st.session_state[count_key] = count + (start - st.session_state[start_key])
+        st.rerun()
+    render_slice(start, stop)
+    st.caption(f"Righe {start + 1}–{stop} di {total}")
+    if stop < total and st.button("Carica altri", key=f"{key}_more"):
+        st.session_state[count_key] = count + page_size
+        st.rerun()
+
+
+def display_full_transcription(transcript: Transcript, session_id: str = "") -> None:
+    """Display the transcript one sentence per line, a window at a time.
+
+    ``session_id`` scopes the viewer's position, so each session opens at its
+    own offset.
+    """
+    index = sentence_index(transcript)
+    if not len(index):
+        st.write("Nessun dato di conversazione disponibile.")
+        return
+    # Set when the session was opened from a search result
+    key = f"full_transcription_{session_id}"
+    jump_time = st.session_state.pop("transcript_jump_time", None)
+    if jump_time is not None:
+        st.session_state[f"{key}_start"] = index.at_time(jump_time)
+
+    def render_slice(start: int, stop: int) -> None:
+        st.write("\n".join(index.sentences(start, stop)))
+
+    render_window(key, index.start, render_slice)
+
+
+def chat_block_html(groups: list[dict]) -> str:
+    """Return ``groups`` as one HTML block of chat bubbles with escaped text.
+
+    The block is styled by ``chat_block_style.md`` and mirrors the avatars
+    and roles of :func:`render_chat_groups`.
+    """
+    template = load_template("chat_bubble_template.md")
+    bubbles = "".join(
+        template.format(
+            role=group["role"],
+            avatar=CHAT_AVATARS[group["role"]],
+            text=html.escape(group.get("text", "")),
+        )
+        for group in groups
+    )
+    return f'<div class="chat-block">{bubbles}</div>'
+
+
 # New function: display conversation as a highlighted transcript
-def display_grouped_chat(transcript, epi_summary):
-    """Display the conversation as a highlighted transcript aligned with episodic summaries."""
-    words = transcript.get("data", {}).get("words", [])
-    if not words:
+def display_grouped_chat(transcript, epi_summary, session_id: str = ""):
+    """Display the conversation as a highlighted transcript aligned with episodic summaries.
+
+    ``session_id`` scopes the viewers' expanders and positions to the session.
+    """
+    transcript = as_transcript(transcript)
+    if not len(transcript):
         st.write("Nessun dato di conversazione disponibile.")
         return
-    groups = group_messages_by_speaker(words)
+    groups = transcript.derived("speaker_groups", group_messages_by_speaker)
     st.subheader("Conversazione per riassunti episodici")
     if not epi_summary:
         st.write("Nessun riassunto episodico disponibile.")
         summaries = []
     else:
         summaries = epi_summary.get("summary_list", [])
-    current_index = 0
+    alignment = SummaryAlignment(
+        groups,
+        summaries,
+        transcript.derived("group_end_index", lambda t: group_end_index(groups)),
+    )
+    template = load_template("episodic_summary_template.md")
+    single_block = st.toggle(
+        "Conversazione compatta",
+        value=CHAT_SINGLE_BLOCK_DEFAULT,
+        key="chat_single_block",
+        help="Mostra ogni conversazione come un unico blocco, più veloce per sedute lunghe.",
+    )
+    if single_block:
+        st.markdown(load_markdown("chat_block_style.md"), unsafe_allow_html=True)
+    # Blocks are memoised with the transcript, keyed by summary and its boundaries
+    bounds_key = hash(tuple(alignment.summary_ends))
     for idx, epi in enumerate(summaries):
         summary_text = epi.get("summary", "")
-        end_time = float(epi.get("end_position", "0"))
-
-        template = load_markdown("episodic_summary_template.md")
-        with stylable_container(key=f"summary_card_{idx}", css_styles=CARD_STYLE):
+        with themed("card", f"summary_card_{idx}"):
             st.markdown(template.format(summary_text=summary_text))
-            with st.expander("Mostra conversazione correlata", expanded=False):
-                # Render grouped messages as chat bubbles instead of colored text
-                start_idx = current_index
-                while current_index < len(groups):
-                    group = groups[current_index]
-                    group_end = group.get("end_time", 0)
-                    if group_end and group_end > end_time:
-                        break
-
-                    raw_speaker = str(group.get("speaker", ""))
-                    speaker = raw_speaker.lower()
-
-                    # Map common tags to chat roles
-                    # - therapist → assistant
-                    # - patient  → user
-                    # - SPEAKER_1 → assistant, SPEAKER_0 → user
-                    if "speaker_1" in speaker or speaker.endswith("_1") or "therap" in speaker:
-                        role = "assistant"
-                    elif "speaker_0" in speaker or speaker.endswith("_0") or "patient" in speaker:
-                        role = "user"
+            # Rerun on toggle so a summary's conversation is only built while open
+            related = st.expander(
+                "Mostra conversazione correlata",
+                expanded=False,
+                key=f"summary_conversation_{session_id}_{idx}",
+                on_change="rerun",
+            )
+            with related:
+                if related.open:
+                    summary_groups = alignment.groups_for(idx)
+                    if summary_groups and single_block:
+                        block = transcript.derived(
+                            f"chat_block_{idx}_{bounds_key}",
+                            lambda t, rows=summary_groups: chat_block_html(rows),
+                        )
+                        st.markdown(block, unsafe_allow_html=True)
+                    elif summary_groups:
+                        # Render grouped messages as chat bubbles instead of colored text
+                        render_window(
+                            f"summary_chat_{session_id}_{idx}",
+                            forward_filled([g["start_time"] for g in summary_groups]),
+                            lambda start, stop, rows=summary_groups: render_chat_groups(
+                                rows[start:stop]
+                            ),
+                        )
                     else:
-                        role = "user"
-
-                    avatar = "🧑‍⚕️" if role == "assistant" else "👤"
-                    text = group.get("text", "")
-
-                    with st.chat_message(role, avatar=avatar):
-                        # Optionally show who is speaking if speaker ids are meaningful
-                        # st.caption(group.get("speaker", ""))
-                        st.write(text)
-
-                    current_index += 1
-
-                if current_index == start_idx:
-                    st.write("Nessuna conversazione per questo riassunto.")
+                        st.write("Nessuna conversazione per questo riassunto.")
 
 
 def session_page(session_id: str):
     """Render a session page."""
     # Apply shared styles
     st.markdown(load_markdown("login_style.md"), unsafe_allow_html=True)
+    inject_theme()
 
     nav_left, _, nav_refresh, nav_delete = st.columns([1, 6, 1, 1])
     with nav_left:  # noqa: SIM117
-        with stylable_container(key="back_scope_session", css_styles=WHITE_BUTTON_STYLE):
+        with themed("white-button", "back_scope_session"):
             if st.button("Indietro"):
                 st.session_state["page"] = "patient_page"
                 st.rerun()
     with nav_refresh:  # noqa: SIM117
-        with stylable_container(key="refresh_scope_session", css_styles=WHITE_BUTTON_STYLE):
+        with themed("white-button", "refresh_scope_session"):
             if st.button("Aggiorna"):
                 user_id = st.session_state.get("user_id")
                 if user_id:
@@ -229,7 +631,7 @@ def session_page(session_id: str):
                         refreshed if isinstance(refreshed, dict) else json.loads(refreshed)
                     )
     with nav_delete:  # noqa: SIM117
-        with stylable_container(key="delete_scope_session", css_styles=DELETE_SESSION_BUTTON_STYLE):
+        with themed("delete-button", "delete_scope_session"):
             if st.button("Elimina"):
                 user_id = st.session_state.get("user_id", "")
                 patient_id = st.session_state.get("selected_patient_id", "")
@@ -237,6 +639,7 @@ def session_page(session_id: str):
                 if "error" in resp:
                     st.error(resp["error"])
                 else:
+                    forget_session(user_id, patient_id, session_id)
                     st.success("Seduta eliminata")
                     st.session_state["page"] = "patient_page"
                     st.rerun()
@@ -244,7 +647,7 @@ def session_page(session_id: str):
 
     st.title("Pagina della seduta")
 
-    with stylable_container(key="session_disclaimer", css_styles=DISCLAIMER_STYLE):
+    with themed("disclaimer", "session_disclaimer"):
         st.markdown(
             "This page displays data generated from automated processing of session recordings, "
             "including transcription, summarization, and analytics. Please review all results "
@@ -253,37 +656,72 @@ def session_page(session_id: str):
 
     if session_id:
         epi_summary = json.loads(get_epi_summary_api_call(session_id))
-        transcript = json.loads(get_transcription_api_call(session_id))
+        user_id = api_client.current_user_id()
+        if user_id and "error" not in epi_summary:
+            search_index.index_episodic_summary(
+                user_id,
+                session_id,
+                st.session_state.get("selected_patient_id", ""),
+                epi_summary.get("episodic_summary", {}),
+            )
+        transcript = load_transcript(session_id)
         st.write(f"Session ID: {session_id}")
+        if transcript is None:
+            st.error("Trascrizione non disponibile.")
+            return
 
-        with stylable_container(key="session_activity_card", css_styles=CARD_STYLE):
+        with themed("card", "session_activity_card"):
             display_activity_chart(transcript)
 
-        with stylable_container(key="session_conversation_card", css_styles=CARD_STYLE):
-            display_grouped_chat(transcript, epi_summary.get("episodic_summary", {}))
-            with stylable_container(key="edit_transcript_scope", css_styles=WHITE_BUTTON_STYLE):
+        with themed("card", "session_conversation_card"):
+            display_grouped_chat(
+                transcript, epi_summary.get("episodic_summary", {}), session_id=session_id
+            )
+            with themed("white-button", "edit_transcript_scope"):
                 if st.button("Modifica", key="edit_transcript_btn"):
                     st.session_state["page"] = "edit_session_page"
                     st.session_state["edit_session_id"] = session_id
                     st.info("Pagina di modifica in arrivo!")
 
-        words = transcript.get("data", {}).get("words", [])
-        full_text = " ".join(w.get("word", "") for w in words)
-        sentences = [s.strip() for s in full_text.split(".") if s.strip()]
-        full_transcription = ".\n".join(f"{s}." for s in sentences)
-
-        with stylable_container(key="full_transcription_card", css_styles=CARD_STYLE):
+        with themed("card", "full_transcription_card"):
             with st.expander("Trascrizione completa", expanded=True):
-                st.write(full_transcription)
+                display_full_transcription(transcript, session_id=session_id)
+
+
+def load_transcript(session_id: str) -> Transcript | None:
+    """Return the session's transcript in columnar form, cached across reruns.
+
+    On a cache miss the transcript is downloaded, converted once and its
+    stats are recorded; ``None`` means it could not be fetched.
+    """
+    key = make_key(api_client.current_user_id(), "transcript", {"transcription_id": session_id})
+    cached = TRANSCRIPT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    payload = get_transcription_api_call(session_id)
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    if "error" in payload:
+        return None
+    transcript = Transcript.from_payload(payload)
+    stats = SessionStats.record(session_id, transcript)
+    transcript.derived("session_stats", lambda t: stats)
+    user_id = api_client.current_user_id()
+    if user_id:
+        search_index.index_transcript(
+            user_id, session_id, st.session_state.get("selected_patient_id", ""), transcript
+        )
+    TRANSCRIPT_CACHE.put(key, transcript, size=transcript.nbytes)
+    return transcript
 
 
 def get_transcription_api_call(transcription_id: str) -> Any:
     """Call the API to get session details."""
     try:
-        response = requests.get(
-            f"{backend_url()}/get_transcription",
+        response = api_client.cached_get(
+            "/get_transcription",
             params={"transcription_id": transcription_id},
-            headers=auth_headers(),
+            ttl=api_client.TRANSCRIPT_CACHE_TTL,
         )
         response.raise_for_status()
         return response.json()
@@ -294,10 +732,9 @@ def get_transcription_api_call(transcription_id: str) -> Any:
 def get_epi_summary_api_call(trascription_id: str) -> Any:
     """Call the API to get episodic summary."""
     try:
-        response = requests.get(
-            f"{backend_url()}/get_summary",
+        response = api_client.cached_get(
+            "/get_summary",
             params={"transcription_id": trascription_id},
-            headers=auth_headers(),
         )
         response.raise_for_status()
         return response.json()
@@ -0,0 +1,163 @@
+"""Persisted per-session analytics."""
+
+import os
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from firebase_handler import delete_json, load_json, save_json
+from transcript import Transcript, speaker_role
+
+COLLECTION = "session_stats"
+# Bumped whenever fields are added, so older stored stats are recomputed
+STATS_VERSION = 2
+# Pauses between consecutive words at least this long (seconds) count as silences
+SILENCE_THRESHOLD = float(os.getenv("SILENCE_THRESHOLD", "2"))
+
+
+class SpeakerStats(BaseModel):
+    """Talk metrics of one speaker in a session."""
+
+    role: str = "user"
+    word_count: int = 0
+    talk_time: float = 0.0
+    turns: int = 0
+    mean_turn_words: float = 0.0
+    mean_turn_duration: float = 0.0
+
+
+class SessionStats(BaseModel):
+    """Small per-transcription aggregate shown in session lists and analytics."""
+
+    version: int = 1
+    word_count: int = 0
+    duration: float = 0.0
+    turn_count: int = 0
+    words_per_minute: float = 0.0
+    silence_count: int = 0
+    silence_total: float = 0.0
+    longest_silence: float = 0.0
+    speakers: dict[str, SpeakerStats] = {}
+
+    @property
+    def talk_time(self) -> float:
+        """Return the talk time of all speakers in seconds."""
+        return sum(s.talk_time for s in self.speakers.values())
+
+    @property
+    def speaker_shares(self) -> dict[str, float]:
+        """Return each speaker's share of the total talk time (0-1)."""
+        total = self.talk_time
+        return {
+            speaker: s.talk_time / total if total else 0.0 for speaker, s in self.speakers.items()
+        }
+
+    @property
+    def talk_share(self) -> dict[str, float]:
+        """Return each role's share of the total talk time (0-1)."""
+        shares: dict[str, float] = {}
+        for speaker, share in self.speaker_shares.items():
+            role = self.speakers[speaker].role
+            shares[role] = shares.get(role, 0.0) + share
+        return shares
+
+    @property
+    def patient_share(self) -> float:
+        """Return the patient's share of the total talk time (0-1)."""
+        return self.talk_share.get("user", 0.0)
+
+    @staticmethod
+    def from_transcript(transcript: "Transcript | dict[str, Any]") -> "SessionStats":
+        """Compute every metric from a transcript in one vectorised pass.
+
+        ``transcript`` is a :class:`Transcript` or a ``get_transcription``
+        payload. Talk time is the sum of word durations; a turn is a run of
+        consecutive words by the same speaker; silences are gaps between
+        consecutive words of at least ``SILENCE_THRESHOLD`` seconds.
+        """
+        if not isinstance(transcript, Transcript):
+            transcript = Transcript.from_payload(transcript)
+        n = len(transcript)
+        if not n:
+            return SessionStats(version=STATS_VERSION)
+        start, end, codes = transcript.start, transcript.end, transcript.speaker_codes
+        n_speakers = len(transcript.speakers)
+
+        word_time = np.clip(np.nan_to_num(end - start), 0, None)
+        words = np.bincount(codes, minlength=n_speakers)
+        talk = np.bincount(codes, weights=word_time, minlength=n_speakers)
+
+        run_starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+        run_ends = np.append(run_starts[1:], n) - 1
+        run_codes = codes[run_starts]
+        turns = np.bincount(run_codes, minlength=n_speakers)
+        run_time = np.clip(np.nan_to_num(end[run_ends] - start[run_starts]), 0, None)
+        turn_time = np.bincount(run_codes, weights=run_time, minlength=n_speakers)
+
+        gaps = start[1:] - end[:-1]
+        silences = gaps[~np.isnan(gaps) & (gaps >= SILENCE_THRESHOLD)]
+
+        duration = transcript.duration
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_words = np.where(turns > 0, words / turns, 0.0)
+            mean_time = np.where(turns > 0, turn_time / turns, 0.0)
+        return SessionStats(
+            version=STATS_VERSION,
+            word_count=n,
+            duration=duration,
+            turn_count=len(run_starts),
+            words_per_minute=n / (duration / 60) if duration > 0 else 0.0,
+            silence_count=len(silences),
+            silence_total=float(silences.sum()),
+            longest_silence=float(silences.max()) if len(silences) else 0.0,
+            speakers={
+                speaker: SpeakerStats(
+                    role=speaker_role(speaker),
+                    word_count=int(words[code]),
+                    talk_time=float(talk[code]),
+                    turns=int(turns[code]),
+                    mean_turn_words=float(mean_words[code]),
+                    mean_turn_duration=float(mean_time[code]),
+                )
+                for code, speaker in enumerate(transcript.speakers)
+            },
+        )
+
+    @staticmethod
+    def load_stats(transcription_id: str) -> "SessionStats | None":
+        """Load stored stats for a transcription."""
+        data = load_json(COLLECTION, transcription_id)
+        if data:
+            return SessionStats(**data)
+        return None
+
+    @staticmethod
+    def load_current(transcription_id: str) -> "SessionStats | None":
+        """Load stored stats unless they predate the current ``STATS_VERSION``."""
+        stored = SessionStats.load_stats(transcription_id)
+        if stored is not None and stored.version >= STATS_VERSION:
+            return stored
+        return None
+
+    @staticmethod
+    def save_stats(transcription_id: str, stats: "SessionStats") -> None:
+        """Save stats for a transcription."""
+        save_json(COLLECTION, transcription_id, stats.model_dump())
+
+    @staticmethod
+    def delete_stats(transcription_id: str) -> bool:
+        """Delete stored stats for a transcription."""
+        return delete_json(COLLECTION, transcription_id)
+
+    @staticmethod
+    def record(
+        transcription_id: str, transcript: "Transcript | dict[str, Any]"
+    ) -> "SessionStats":
+        """Return current stored stats, computing and saving them from ``transcript`` if missing."""
+        stored = SessionStats.load_current(transcription_id)
+        if stored is not None:
+            return stored
+        stats = SessionStats.from_transcript(transcript)
+        SessionStats.save_stats(transcription_id, stats)
+        return stats
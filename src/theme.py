@@ -0,0 +1,88 @@
+"""One page-wide stylesheet built from the CSS snippets in ``styles.py``.
+
+Instead of wrapping every element in a ``stylable_container`` that ships its
+own copy of the CSS, containers are tagged with a theme class through their
+key (see :func:`themed`) and a single stylesheet, built once at import and
+injected once per page run by :func:`inject_theme`, styles all of them.
+"""
+
+import re
+
+import streamlit as st
+
+from styles import (
+    CARD_STYLE,
+    CHECKBOX_STYLE,
+    DELETE_SESSION_BUTTON_STYLE,
+    DISCLAIMER_STYLE,
+    HSTACK_LEFT,
+    HSTACK_RIGHT,
+    INPUT_STYLE,
+    SELECT_STYLE,
+    SMALL_CARD_STYLE,
+    WHITE_BUTTON_STYLE,
+    YELLOW_BUTTON_STYLE,
+)
+
+# Theme class name -> CSS snippet in ``stylable_container`` form: a block
+# without selector styles the container itself, others style its descendants
+THEME_CLASSES = {
+    "card": CARD_STYLE,
+    "small-card": SMALL_CARD_STYLE,
+    "white-button": WHITE_BUTTON_STYLE,
+    "yellow-button": YELLOW_BUTTON_STYLE,
+    "delete-button": DELETE_SESSION_BUTTON_STYLE,
+    "input": INPUT_STYLE,
+    "select": SELECT_STYLE,
+    "checkbox": CHECKBOX_STYLE,
+    "disclaimer": DISCLAIMER_STYLE,
+    "hstack-left": HSTACK_LEFT,
+    "hstack-right": HSTACK_RIGHT,
+}
+# Prefix of container keys carrying a theme class: ``tc-<class>--<key>``
+KEY_PREFIX = "tc-"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_RULE_RE = re.compile(r"([^{}]*)\{([^{}]*)\}")
+
+
+def class_selector(name: str) -> str:
+    """Return the CSS selector matching every container tagged with ``name``."""
+    # Streamlit renders a container's key as the class ``st-key-<key>``
+    return f'[class*="st-key-{KEY_PREFIX}{name}--"]'
+
+
+def scope_css(scope: str, css: str) -> str:
+    """Return ``css`` with every selector of every rule nested under ``scope``."""
+    rules = []
+    for selectors, body in _RULE_RE.findall(_COMMENT_RE.sub("", css)):
+        scoped = ", ".join(
+            f"{scope} {selector.strip()}" if selector.strip() else scope
+            for selector in selectors.split(",")
+        )
+        rules.append(f"{scoped} {{{body.strip()}}}")
+    return "\n".join(rules)
+
+
+def build_stylesheet() -> str:
+    """Return the stylesheet of all theme classes."""
+    return "\n".join(scope_css(class_selector(name), css) for name, css in THEME_CLASSES.items())
+
+
+STYLESHEET = build_stylesheet()
+
+
+def inject_theme() -> None:
+    """Add the theme stylesheet to the page; call once per page run."""
+    st.markdown(f"<style>{STYLESHEET}</style>", unsafe_allow_html=True)
+
+
+def themed(name: str, key: str):
+    """Return a container styled by theme class ``name``.
+
+    ``key`` only has to be unique on the page; no CSS is sent with the
+    container itself.
+    """
+    if name not in THEME_CLASSES:
+        raise KeyError(f"Unknown theme class: {name}")
+    return st.container(key=f"{KEY_PREFIX}{name}--{key}")
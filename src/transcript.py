@@ -0,0 +1,174 @@
+"""Compact columnar representation of a word-level transcript."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+
+class Transcript:
+    """Word-level transcript stored as parallel arrays instead of per-word dicts.
+
+    Attributes
+    ----------
+    start, end:
+        ``float64`` arrays of word timestamps in seconds (``NaN`` if missing).
+    speaker_codes:
+        ``int32`` array indexing into ``speakers``.
+    speakers:
+        Distinct speaker ids in order of first appearance.
+    text:
+        All words joined by single spaces in one string.
+    word_start, word_end:
+        ``int64`` character offsets of each word inside ``text``, so any run
+        of consecutive words is the single slice
+        ``text[word_start[i]:word_end[j - 1]]``.
+
+    Views derived from these arrays (activity bins, indexes, ...) can be
+    memoised on the instance with :meth:`derived`, so they live and expire
+    together with the cached transcript.
+    """
+
+    __slots__ = (
+        "start",
+        "end",
+        "speaker_codes",
+        "speakers",
+        "text",
+        "word_start",
+        "word_end",
+        "_derived",
+    )
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        end: np.ndarray,
+        speaker_codes: np.ndarray,
+        speakers: list[str],
+        text: str,
+        word_start: np.ndarray,
+        word_end: np.ndarray,
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.speaker_codes = speaker_codes
+        self.speakers = speakers
+        self.text = text
+        self.word_start = word_start
+        self.word_end = word_end
+        self._derived: dict[str, Any] = {}
+
+    @classmethod
+    def from_words(cls, words: list[dict[str, Any]]) -> Transcript:
+        """Build a transcript from the API's list of per-word dicts."""
+        n = len(words)
+        start = np.full(n, np.nan)
+        end = np.full(n, np.nan)
+        speaker_codes = np.empty(n, dtype=np.int32)
+        lengths = np.empty(n, dtype=np.int64)
+        speaker_index: dict[str, int] = {}
+        tokens: list[str] = []
+        for i, w in enumerate(words):
+            s = w.get("start")
+            e = w.get("end")
+            if s is not None:
+                start[i] = s
+            if e is not None:
+                end[i] = e
+            speaker = w.get("speaker_id", "unknown")
+            code = speaker_index.get(speaker)
+            if code is None:
+                code = speaker_index[speaker] = len(speaker_index)
+            speaker_codes[i] = code
+            token = w.get("word", "")
+            tokens.append(token)
+            lengths[i] = len(token)
+        # Each word is followed by one separator space except the last
+        word_start = np.zeros(n, dtype=np.int64)
+        if n:
+            word_start[1:] = np.cumsum(lengths[:-1] + 1)
+        word_end = word_start + lengths
+        return cls(
+            start=start,
+            end=end,
+            speaker_codes=speaker_codes,
+            speakers=list(speaker_index),
+            text=" ".join(tokens),
+            word_start=word_start,
+            word_end=word_end,
+        )
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> Transcript:
+        """Build a transcript from a ``get_transcription`` response."""
+        return cls.from_words(payload.get("data", {}).get("words", []))
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint in bytes."""
+        arrays = (self.start, self.end, self.speaker_codes, self.word_start, self.word_end)
+        return sum(a.nbytes for a in arrays) + len(self.text) + 64 * len(self.speakers)
+
+    def derived(self, name: str, build: Callable[[Transcript], Any]) -> Any:
+        """Return ``build(self)``, computed on first use and memoised under ``name``."""
+        if name not in self._derived:
+            self._derived[name] = build(self)
+        return self._derived[name]
+
+    def word(self, i: int) -> str:
+        """Return the ``i``-th word."""
+        return self.text[self.word_start[i]:self.word_end[i]]
+
+    def join(self, i: int, j: int) -> str:
+        """Return words ``i`` to ``j - 1`` joined by spaces, without copying per word."""
+        if j <= i:
+            return ""
+        return self.text[self.word_start[i]:self.word_end[j - 1]]
+
+    def speaker(self, i: int) -> str:
+        """Return the speaker id of the ``i``-th word."""
+        return self.speakers[self.speaker_codes[i]]
+
+    @property
+    def duration(self) -> float:
+        """Return the latest word end time, or 0 for an empty transcript."""
+        if not len(self) or np.isnan(self.end).all():
+            return 0.0
+        return float(np.nanmax(self.end))
+
+
+def speaker_role(speaker: str) -> str:
+    """Map a speaker id to a chat role.
+
+    - therapist → assistant
+    - patient  → user
+    - SPEAKER_1 → assistant, SPEAKER_0 → user
+    """
+    speaker = str(speaker).lower()
+    if "speaker_1" in speaker or speaker.endswith("_1") or "therap" in speaker:
+        return "assistant"
+    return "user"
+
+
+def forward_filled(times) -> np.ndarray:
+    """Return ``times`` with missing values carried forward and made non-decreasing.
+
+    The result is sorted, so it can be searched with :func:`bisect.bisect_left`.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    known = np.where(np.isnan(times), -np.inf, times)
+    filled = np.maximum.accumulate(known) if len(known) else known
+    return np.where(np.isneginf(filled), 0.0, filled)
+
+
+def as_transcript(words: Transcript | list[dict[str, Any]]) -> Transcript:
+    """Return ``words`` as a :class:`Transcript`, converting a list of word dicts."""
+    if isinstance(words, Transcript):
+        return words
+    return Transcript.from_words(words or [])
@@ -0,0 +1,252 @@
+"""Streaming upload helpers for session recordings."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any, BinaryIO
+
+import requests
+
+import api_client
+
+# Bytes read from disk per chunk while streaming a request body.
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+# Size of each independently acknowledged part of a resumable upload.
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+# Attempts per part before a resumable upload gives up.
+UPLOAD_PART_RETRIES = int(os.getenv("UPLOAD_PART_RETRIES", "5"))
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class MultipartFileStream:
+    """File-like ``multipart/form-data`` body that reads the file part from disk.
+
+    Only one chunk of the file is held in memory at a time, whatever the size
+    of the recording. ``requests`` uses ``len()`` for the ``Content-Length``
+    header and then calls :meth:`read` until it returns ``b""``.
+
+    Parameters
+    ----------
+    fields:
+        Plain form fields sent before the file.
+    file_field:
+        Form field name of the file part.
+    path:
+        Path of the file to stream.
+    filename, content_type:
+        Values of the file part's ``filename`` and ``Content-Type``.
+    progress_callback:
+        Called with ``(bytes_sent, total_bytes)`` after every read.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        file_field: str,
+        path: str,
+        filename: str,
+        content_type: str,
+        progress_callback: ProgressCallback | None = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+    ) -> None:
+        self.boundary = uuid.uuid4().hex
+        self.path = path
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        head = b"".join(
+            self._part_header(name, None, None) + str(value).encode("utf-8") + b"\r\n"
+            for name, value in fields.items()
+        )
+        head += self._part_header(file_field, filename, content_type)
+        self._head = head
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._file_size = os.path.getsize(path)
+        self._total = len(self._head) + self._file_size + len(self._tail)
+        self._sent = 0
+        self._file: BinaryIO | None = None
+        self._stage = 0  # 0: head, 1: file, 2: done
+
+    @property
+    def content_type(self) -> str:
+        """Return the ``Content-Type`` header value including the boundary."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _part_header(self, name: str, filename: str | None, content_type: str | None) -> bytes:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode("utf-8")
+
+    def read(self, size: int = -1) -> bytes:
+        """Return the next piece of the body (at most one chunk of the file)."""
+        if size is None or size < 0:
+            size = self.chunk_size
+        chunk = b""
+        if self._stage == 0:
+            chunk = self._head
+            self._stage = 1
+            self._file = open(self.path, "rb")  # noqa: SIM115 - closed after the last chunk
+        elif self._stage == 1:
+            chunk = self._file.read(min(size, self.chunk_size)) if self._file else b""
+            if not chunk:
+                self.close()
+                chunk = self._tail
+                self._stage = 2
+        if chunk:
+            self._sent += len(chunk)
+            if self.progress_callback is not None:
+                self.progress_callback(self._sent, self._total)
+        return chunk
+
+    def close(self) -> None:
+        """Close the underlying file if it is open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> MultipartFileStream:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Upload ids of unfinished resumable uploads, so a later attempt for the same
+# file continues where the previous one stopped.
+_PENDING_UPLOADS: dict[tuple, str] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+def _upload_key(path: str, fields: dict[str, str]) -> tuple:
+    stat = os.stat(path)
+    return (
+        fields.get("user_id", ""),
+        fields.get("patient_id", ""),
+        os.path.abspath(path),
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+def _acknowledged_parts(
+    upload_id: str, headers: dict[str, str] | None = None
+) -> set[int] | None:
+    """Return part indexes the backend already holds, or ``None`` if the upload is unknown."""
+    response = api_client.get(
+        "/upload/status", params={"upload_id": upload_id}, headers=headers
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return {int(i) for i in response.json().get("received_parts", [])}
+
+
+def resumable_upload(
+    path: str,
+    fields: dict[str, str],
+    filename: str,
+    content_type: str,
+    progress_callback: ProgressCallback | None = None,
+    part_size: int = UPLOAD_PART_SIZE,
+    max_retries: int = UPLOAD_PART_RETRIES,
+    headers: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Upload ``path`` in fixed-size, content-hashed parts and finalise it.
+
+    The backend acknowledges each part (checked against its SHA-256). When a
+    connection drops, the acknowledged parts are re-read from the backend and
+    the upload continues from there instead of restarting; the upload id is
+    also kept for later calls with the same file. Returns the JSON response of
+    the completion call, which has the same shape as ``process_audio``.
+    ``headers`` carry the caller's auth when running off the script thread.
+    """
+    size = os.path.getsize(path)
+    part_count = max(1, -(-size // part_size))
+    key = _upload_key(path, fields)
+    with _PENDING_LOCK:
+        upload_id = _PENDING_UPLOADS.get(key)
+    acked = _acknowledged_parts(upload_id, headers) if upload_id else None
+    if acked is None:
+        response = api_client.post(
+            "/upload/start",
+            data={
+                **fields,
+                "filename": filename,
+                "content_type": content_type,
+                "size": str(size),
+                "part_size": str(part_size),
+                "part_count": str(part_count),
+            },
+            headers=headers,
+        )
+        response.raise_for_status()
+        upload_id = response.json()["upload_id"]
+        acked = set()
+        with _PENDING_LOCK:
+            _PENDING_UPLOADS[key] = upload_id
+
+    def report() -> None:
+        if progress_callback is not None:
+            done = sum(min(part_size, size - i * part_size) for i in acked)
+            progress_callback(done, size)
+
+    report()
+    with open(path, "rb") as audio_file:
+        for index in range(part_count):
+            if index in acked:
+                continue
+            audio_file.seek(index * part_size)
+            part = audio_file.read(part_size)
+            digest = hashlib.sha256(part).hexdigest()
+            for attempt in range(max_retries):
+                try:
+                    response = api_client.request(
+                        "PUT",
+                        "/upload/part",
+                        params={"upload_id": upload_id, "index": index, "sha256": digest},
+                        data=part,
+                        headers={**(headers or {}), "Content-Type": "application/octet-stream"},
+                    )
+                    if response.status_code < 500 and response.status_code != 409:
+                        response.raise_for_status()
+                        break
+                    # 5xx or hash mismatch (409): send the part again
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == max_retries - 1:
+                        raise
+                time.sleep(min(0.5 * 2**attempt, 10))
+                try:  # the part may have landed before the connection dropped
+                    acked = _acknowledged_parts(upload_id, headers) or set()
+                except (requests.ConnectionError, requests.Timeout):
+                    continue
+                if index in acked:
+                    break
+            else:
+                response.raise_for_status()
+                raise requests.HTTPError(f"Part {index} rejected after {max_retries} attempts")
+            acked.add(index)
+            report()
+
+    # Finalising triggers transcription: keep the connect timeout, no read timeout
+    response = api_client.post(
+        "/upload/complete",
+        data={**fields, "upload_id": upload_id},
+        headers=headers,
+        timeout=(api_client.CONNECT_TIMEOUT, None),
+    )
+    response.raise_for_status()
+    with _PENDING_LOCK:
+        _PENDING_UPLOADS.pop(key, None)
+    return response.json()
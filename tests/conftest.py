@@ -0,0 +1,32 @@
+"""Shared fixtures for the test suite."""
+
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Application modules live flat in ``src`` and import each other by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture
+def stand_in_backend(monkeypatch):
+    """Start a local backend from a request handler class and point the API client at it."""
+    servers = []
+
+    def start(handler_class):
+        import api_client
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        monkeypatch.setattr(api_client, "backend_url", lambda: url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,66 @@
+"""Activity binning and chart downsampling of the session page."""
+
+import random
+
+import numpy as np
+
+from session_page import compute_activity_bins, compute_activity_data, lttb
+
+
+def random_words(n, seed=0):
+    rng = random.Random(seed)
+    words = []
+    for i in range(n):
+        start = None if rng.random() < 0.05 else rng.uniform(0, 5400)
+        words.append({"word": f"w{i}", "start": start, "end": start, "speaker_id": "SPEAKER_0"})
+    return words
+
+
+def loop_bins(words, interval):
+    """Word counts per bin as the original per-word loop computed them."""
+    counts = {}
+    for w in words:
+        if w["start"] is not None:
+            b = int(w["start"] // interval)
+            counts[b] = counts.get(b, 0) + 1
+    if not counts:
+        return []
+    return [counts.get(b, 0) for b in range(max(counts) + 1)]
+
+
+def test_bins_match_plain_loop_at_every_resolution():
+    words = random_words(5000)
+    bins = compute_activity_bins(words)
+    for interval, counts in bins.items():
+        expected = loop_bins(words, interval)
+        assert counts.tolist()[: len(expected)] == expected
+        assert not counts[len(expected):].any()
+
+
+def test_sixty_second_data_matches_plain_loop():
+    words = random_words(2000, seed=1)
+    data = compute_activity_data(words, interval=60)
+    assert [row["words"] for row in data] == loop_bins(words, 60)
+    assert [row["time"] for row in data] == [60 * i for i in range(len(data))]
+
+
+def test_empty_transcript_has_no_bins():
+    assert all(len(c) == 0 for c in compute_activity_bins([]).values())
+    assert compute_activity_data([], interval=60) == []
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(8640, dtype=np.float64)
+    y = np.random.default_rng(0).poisson(5, len(x)).astype(np.float64)
+    y[4321] = 500.0
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert (np.diff(keep) > 0).all()
+    assert 4321 in keep
+
+
+def test_lttb_returns_short_series_unchanged():
+    x = np.arange(10, dtype=np.float64)
+    assert lttb(x, x, 500).tolist() == list(range(10))
+    assert lttb(x, x, 2).tolist() == list(range(10))
@@ -0,0 +1,51 @@
+"""Conditional revalidation of cached backend responses."""
+
+from http.server import BaseHTTPRequestHandler
+
+import api_client
+
+ETAG = '"v1"'
+BODY = b'{"transcription": []}'
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serve one resource with an ``ETag``, answering ``304`` when it matches."""
+
+    seen_if_none_match: list[str | None] = []
+
+    def do_GET(self):
+        validator = self.headers.get("If-None-Match")
+        ETagHandler.seen_if_none_match.append(validator)
+        if validator == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_conditional_get_revalidates_with_etag(stand_in_backend):
+    ETagHandler.seen_if_none_match = []
+    stand_in_backend(ETagHandler)
+    api_client.RESPONSE_CACHE.clear()
+    params = {"transcription_id": "t1"}
+
+    first = api_client.conditional_get("/get_transcription", params=params, user_id="u1")
+    assert first.status_code == 200
+    assert first.content == BODY
+
+    revalidations = api_client.cache_stats()["revalidations"]
+    second = api_client.conditional_get("/get_transcription", params=params, user_id="u1")
+
+    assert ETagHandler.seen_if_none_match == [None, ETAG]
+    assert second.status_code == 200
+    assert second.content == BODY
+    assert api_client.cache_stats()["revalidations"] == revalidations + 1
@@ -0,0 +1,79 @@
+"""Grouping of transcript words into speaker runs."""
+
+import random
+
+from session_page import SpeakerGrouper, SummaryAlignment, group_messages_by_speaker
+
+
+def random_words(n, seed=0):
+    rng = random.Random(seed)
+    speakers = ["SPEAKER_0", "SPEAKER_1", "therapist"]
+    speaker = speakers[0]
+    words = []
+    t = 0.0
+    for i in range(n):
+        if rng.random() < 0.2:
+            speaker = rng.choice(speakers)
+        t += rng.uniform(0.1, 1.0)
+        missing = rng.random() < 0.05
+        words.append(
+            {
+                "word": f"w{i}",
+                "start": None if missing else t,
+                "end": None if missing else t + 0.3,
+                "speaker_id": speaker,
+            }
+        )
+    return words
+
+
+def test_streamed_groups_match_batch_grouping():
+    words = random_words(1000)
+    for seed in range(5):
+        rng = random.Random(seed)
+        grouper = SpeakerGrouper()
+        streamed = []
+        pos = 0
+        while pos < len(words):
+            size = rng.randint(1, 40)
+            streamed.extend(grouper.feed(words[pos:pos + size]))
+            pos += size
+        streamed.extend(grouper.flush())
+        assert streamed == group_messages_by_speaker(words)
+
+
+def test_flush_resets_the_open_run():
+    grouper = SpeakerGrouper()
+    assert grouper.feed([{"word": "ciao", "start": 0.0, "end": 0.5, "speaker_id": "SPEAKER_0"}]) == []
+    assert [g["text"] for g in grouper.flush()] == ["ciao"]
+    assert grouper.flush() == []
+
+
+def pointer_walk(groups, summaries):
+    """Groups per summary as the original sequential walk assigned them."""
+    assigned = []
+    current = 0
+    for epi in summaries:
+        end_time = float(epi.get("end_position", "0"))
+        start = current
+        while current < len(groups):
+            group_end = groups[current].get("end_time", 0)
+            if group_end and group_end > end_time:
+                break
+            current += 1
+        assigned.append(list(range(start, current)))
+    return assigned
+
+
+def test_alignment_matches_pointer_walk_with_tied_summaries():
+    groups = group_messages_by_speaker(random_words(400, seed=3))
+    last = groups[-1]["end_time"]
+    for seed in range(50):
+        rng = random.Random(seed)
+        ends = sorted(rng.choice([rng.uniform(0, last), last / 2]) for _ in range(rng.randint(1, 8)))
+        summaries = [{"end_position": str(end)} for end in ends + [ends[-1]]]
+        alignment = SummaryAlignment(groups, summaries)
+        expected = pointer_walk(groups, summaries)
+        assert [alignment.group_indices(k) for k in range(len(summaries))] == expected
+        assigned = [i for k in range(len(summaries)) for i in alignment.group_indices(k)]
+        assert len(assigned) == len(set(assigned))
@@ -0,0 +1,92 @@
+"""Sentence boundaries and time lookups of transcripts."""
+
+import pytest
+
+from sentence_index import SentenceIndex, is_sentence_end
+from transcript import Transcript
+
+
+@pytest.mark.parametrize(
+    ("word", "expected"),
+    [
+        ("bene.", True),
+        ("davvero?", True),
+        ("basta!", True),
+        ("allora…", True),
+        ("allora...", True),
+        ("bene", False),
+        ("bene,", False),
+        # closing quotes and brackets after the punctuation
+        ('bene."', True),
+        ("finito.»", True),
+        ("(così)", False),
+        ("(così.)", True),
+        # abbreviations
+        ("dott.", False),
+        ("Dott.ssa", False),
+        ("sig.ra", False),
+        ("ecc.", False),
+        ("(ecc.", False),
+        ("e.g.", False),
+        # upper-case initials
+        ("A.", False),
+        ("M.", False),
+        ("«G.", False),
+        # short words still end a sentence
+        ("No.", True),
+        ("no.", True),
+        ("è.", True),
+        ("a.", True),
+        ("e.", True),
+        ("sì.", True),
+    ],
+)
+def test_is_sentence_end(word, expected):
+    assert is_sentence_end(word) is expected
+
+
+def transcript_of(tokens):
+    """Build a transcript of ``(word, start)`` pairs, one second per word by default."""
+    return Transcript.from_words(
+        [
+            {"word": word, "start": start, "end": None if start is None else start + 0.5}
+            for word, start in tokens
+        ]
+    )
+
+
+def test_sentences_split_on_boundaries_only():
+    words = "Il dott. Rossi è arrivato. No. Ha detto: «va bene.» Poi è uscito".split()
+    index = SentenceIndex(transcript_of((w, float(i)) for i, w in enumerate(words)))
+    assert index.sentences(0, len(index)) == [
+        "Il dott. Rossi è arrivato.",
+        "No.",
+        "Ha detto: «va bene.»",
+        "Poi è uscito",
+    ]
+    assert index.start.tolist() == [0.0, 5.0, 6.0, 10.0]
+    assert index.of_word(5) == 1
+    assert index.word_range(1, 3) == (5, 10)
+
+
+def test_at_time_returns_first_sentence_at_or_after():
+    words = "Uno. Due tre. Quattro. Cinque sei.".split()
+    index = SentenceIndex(transcript_of((w, 10.0 * i) for i, w in enumerate(words)))
+    assert index.start.tolist() == [0.0, 10.0, 30.0, 40.0]
+    assert index.at_time(0) == 0
+    assert index.at_time(10) == 1
+    assert index.at_time(11) == 2
+    assert index.at_time(30) == 2
+    assert index.at_time(1000) == 3  # clamped to the last sentence
+
+
+def test_missing_start_times_are_carried_forward():
+    index = SentenceIndex(transcript_of([("Ciao.", 2.0), ("Come", None), ("stai?", 4.0)]))
+    assert index.start.tolist() == [2.0, 2.0]
+    assert index.at_time(3) == 1
+
+
+def test_empty_transcript():
+    index = SentenceIndex(transcript_of([]))
+    assert len(index) == 0
+    assert index.at_time(5) == 0
@@ -0,0 +1,123 @@
+"""Resumable uploads against a stand-in receiver that drops and rejects parts."""
+
+import hashlib
+import json
+import socket
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import uploads
+
+PART_SIZE = 4
+AUDIO = b"0123456789ab"  # three parts
+
+
+class Receiver(BaseHTTPRequestHandler):
+    """Minimal ``/upload/*`` backend with scripted failures per part.
+
+    ``failures`` maps a part index to the outcomes of its next PUTs:
+    ``"drop"`` closes the connection halfway through the body, ``"409"``
+    answers as if the part hash did not match.
+    """
+
+    failures: dict[int, list[str]] = {}
+    received: dict[int, bytes] = {}
+    puts: list[int] = []
+
+    def _reply(self, status, payload=None):
+        body = json.dumps(payload or {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        self._read_body()
+        path = urlparse(self.path).path
+        if path == "/upload/start":
+            self._reply(200, {"upload_id": "up-1"})
+        elif path == "/upload/complete":
+            self._reply(200, {"transcription_id": "t1"})
+        else:
+            self._reply(404)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/upload/status":
+            self._reply(200, {"received_parts": sorted(Receiver.received)})
+        else:
+            self._reply(404)
+
+    def do_PUT(self):
+        query = parse_qs(urlparse(self.path).query)
+        index = int(query["index"][0])
+        Receiver.puts.append(index)
+        outcome = Receiver.failures.get(index, [])
+        outcome = outcome.pop(0) if outcome else "ok"
+        length = int(self.headers["Content-Length"])
+        if outcome == "drop":
+            self.rfile.read(length // 2)
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        part = self.rfile.read(length)
+        if outcome == "409" or hashlib.sha256(part).hexdigest() != query["sha256"][0]:
+            self._reply(409)
+            return
+        Receiver.received[index] = part
+        self._reply(200)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver(stand_in_backend, tmp_path):
+    Receiver.failures = {}
+    Receiver.received = {}
+    Receiver.puts = []
+    uploads._PENDING_UPLOADS.clear()
+    stand_in_backend(Receiver)
+    path = tmp_path / "session.wav"
+    path.write_bytes(AUDIO)
+    return str(path)
+
+
+def upload(path, **kwargs):
+    return uploads.resumable_upload(
+        path,
+        {"user_id": "u1", "patient_id": "p1"},
+        "session.wav",
+        "audio/wav",
+        part_size=PART_SIZE,
+        headers={"Authorization": "Bearer test"},
+        **kwargs,
+    )
+
+
+def test_resume_after_drop_skips_acknowledged_parts(receiver):
+    Receiver.failures = {1: ["drop"]}
+    with pytest.raises(requests.ConnectionError):
+        upload(receiver, max_retries=1)
+    assert sorted(Receiver.received) == [0]
+
+    result = upload(receiver)
+
+    assert result["transcription_id"] == "t1"
+    assert Receiver.puts == [0, 1, 1, 2]
+    assert b"".join(Receiver.received[i] for i in range(3)) == AUDIO
+
+
+def test_rejected_part_is_sent_again(receiver):
+    Receiver.failures = {2: ["409"]}
+
+    upload(receiver)
+
+    assert Receiver.puts == [0, 1, 2, 2]
+    assert Receiver.received[2] == AUDIO[8:]